@@ -0,0 +1,50 @@
+import os, gc, pickle, hashlib, zlib
+
+# bump whenever the node classes or the parser change the shape of the tree
+CACHE_VERSION = 12
+CACHE_DIR = "__solcache__"
+ENABLED = True
+
+def cache_path(fn,optimize=False):
+    head,tail = os.path.split(os.path.abspath(fn))
+    return os.path.join(head,CACHE_DIR,f"{tail}.v{CACHE_VERSION}{'.opt' if optimize else ''}.solc")
+
+def source_hash(text):
+    return hashlib.sha256(text.encode() if isinstance(text,str) else text).digest()
+
+def load(fn,isfromfile,optimize=False):
+    if not ENABLED: return None
+    stat = os.stat(fn)
+    try:
+        with open(cache_path(fn,optimize),"rb") as f:
+            version,cached_isfromfile,mtime,size,digest = pickle.load(f)
+            if version != CACHE_VERSION or cached_isfromfile != isfromfile or size != stat.st_size:
+                return None
+            if mtime != stat.st_mtime_ns:
+                # touched but maybe not edited, fall back to comparing the content
+                with open(fn,"r") as source:
+                    if source_hash(source.read()) != digest: return None
+            data = zlib.decompress(f.read())
+        # the tree is one big acyclic allocation burst, collecting during it only slows loading down
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.loads(data)
+        finally:
+            if enabled: gc.enable()
+    except Exception:
+        return None
+
+def store(fn,text,isfromfile,node,stat,optimize=False):
+    if not ENABLED: return
+    path = cache_path(fn,optimize)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path),exist_ok=True)
+        with open(tmp_path,"wb") as f:
+            pickle.dump((CACHE_VERSION,isfromfile,stat.st_mtime_ns,stat.st_size,source_hash(text)),f,pickle.HIGHEST_PROTOCOL)
+            f.write(zlib.compress(pickle.dumps(node,pickle.HIGHEST_PROTOCOL)))
+        os.replace(tmp_path,path)
+    except (OSError,RecursionError,pickle.PicklingError):
+        # caching is best effort, read-only directories and very deep trees just skip it
+        if os.path.exists(tmp_path): os.remove(tmp_path)
@@ -0,0 +1,65 @@
+import sys, os, time, tracemalloc
+import solace
+from values import List
+
+BENCHMARKS = {
+    "for-loop":"let x = 0; for i=0 to 100000 { let x = x + i * 2 - 1 }; x",
+    "while-loop":"let i = 0; while i < 50000 { let i = i + 1 }; i",
+    "fib":"fun fib(n) => if n < 2 => n else => fib(n-1)+fib(n-2); fib(16)",
+    # the costly right hand side of each guard only runs when the cheap left one lets it through
+    "guards":"fun heavy(n) => len(for i=0 to 50 => i) > n; let c = 0; for i=0 to 5000 { if i > 4900 and heavy(i - 4900) { let c = c + 1 } }; c",
+}
+
+MEMORY_BENCHMARKS = {
+    "numbers":"for i=0 to 100000 => i*3+0.5",
+    "strings":"for i=0 to 100000 => \"item\"+String.tostring(i)",
+    # the loop's value is thrown away, nothing should be kept per iteration
+    "discarded":"fun f() { for i=0 to 100000 => i*3+0.5 }; f()",
+}
+
+def timeit(text,repeat=3,**kwargs):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        _,error = solace.run("<benchmark>",text,**kwargs)
+        elapsed = time.perf_counter()-start
+        if error: raise Exception(error.as_string())
+        best = elapsed if best == None else min(best,elapsed)
+    return best
+
+def bench_engines(names):
+    for name in names:
+        tree = timeit(BENCHMARKS[name],engine="tree")
+        vm = timeit(BENCHMARKS[name],engine="vm")
+        print(f"{name:<12} tree {tree:8.4f}s   vm {vm:8.4f}s   x{tree/vm:.2f}")
+
+def bench_pool(jobs=16):
+    job = ("<benchmark>",BENCHMARKS["fib"])
+    for workers in sorted({1,2,os.cpu_count() or 1}):
+        start = time.perf_counter()
+        for _,_,error in solace.run_many([job]*jobs,workers=workers):
+            if error: raise Exception(error)
+        elapsed = time.perf_counter()-start
+        print(f"run_many     workers {workers:<3} {jobs/elapsed:8.2f} jobs/s")
+
+def bench_memory(names):
+    for name in names:
+        for engine in ("tree","vm"):
+            tracemalloc.start()
+            result,error = solace.run("<benchmark>",MEMORY_BENCHMARKS[name],engine=engine)
+            current,peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            if error: raise Exception(error.as_string())
+            values = result.elements[-1]
+            count = len(values.elements) if isinstance(values,List) else 0
+            del result,values
+            per_value = f"{current/count:8.1f} B/value" if count else f"{current:8d} B total"
+            print(f"{name:<12} {engine:<4} {per_value}   peak {peak/1024/1024:8.2f} MiB")
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["pool"]:
+        bench_pool()
+    elif sys.argv[1:2] == ["memory"]:
+        bench_memory(sys.argv[2:] or MEMORY_BENCHMARKS.keys())
+    else:
+        bench_engines(sys.argv[1:] or BENCHMARKS.keys())
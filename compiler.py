@@ -0,0 +1,271 @@
+from nodes import *
+from tokens import *
+from values import make_number,BINARY_METHODS
+
+OP_LOAD_CONST = 0
+OP_LOAD_NULL = 1
+OP_LOAD_NAME = 2
+OP_STORE_NAME = 3
+OP_LOAD_ATTR = 4
+OP_LOAD_ATTR_TARGET = 5
+OP_STORE_ATTR = 6
+OP_BINARY_OP = 7
+OP_UNARY_OP = 8
+OP_POP = 9
+OP_JUMP = 10
+OP_POP_JUMP_IF_FALSE = 11
+OP_MAKE_FUNCTION = 12
+OP_CALL = 13
+OP_BUILD_LIST = 14
+OP_BUILD_OBJECT = 15
+OP_RETURN_VALUE = 16
+OP_BREAK_LOOP = 17
+OP_CONTINUE_LOOP = 18
+OP_SETUP_LOOP = 19
+OP_FOR_PREP = 20
+OP_FOR_ITER = 21
+OP_WHILE_PREP = 22
+OP_LIST_APPEND = 23
+OP_LOOP_END = 24
+OP_END = 25
+OP_TAIL_CALL = 26
+OP_BINARY_QUICK = 27
+OP_SHORT_CIRCUIT = 28
+OP_LOAD_METHOD = 29
+
+OP_NAMES = {value:name for name,value in globals().items() if name.startswith("OP_")}
+
+UNARY_PLUS = 0
+UNARY_MINUS = 1
+UNARY_NOT = 2
+
+class Code:
+    def __init__(self,name):
+        self.name = name
+        self.instructions = []
+        self.positions = []
+        # inline caches of global and builtin lookups, by instruction index
+        self.caches = {}
+
+    def __repr__(self) -> str:
+        return f"<code {self.name}>"
+
+    def disassemble(self):
+        lines = []
+        for i,(op,arg) in enumerate(self.instructions):
+            pos_start = self.positions[i][0]
+            if op == OP_BINARY_OP or op == OP_UNARY_OP: arg = arg[0]
+            elif op == OP_BINARY_QUICK: arg = arg[1]
+            line = f"{pos_start.ln+1:>4}" if pos_start else "    "
+            lines.append(f"{line} {i:>5} {OP_NAMES[op]:<20} {'' if arg is None else repr(arg)}")
+        return "\n".join(lines)
+
+class Compiler:
+    def __init__(self,name="<program>"):
+        self.code = Code(name)
+
+    def compile_program(self,node):
+        self.compile(node)
+        self.emit(OP_END,None,node)
+        return self.code
+
+    def compile_function(self,node):
+        if node.should_auto_return:
+            self.compile(node.body_node)
+        else:
+            self.compile_block(node.body_node)
+            self.emit(OP_LOAD_NULL,None,node)
+        self.emit(OP_END,None,node)
+        return self.code
+
+    def emit(self,op,arg,node):
+        self.code.instructions.append((op,arg))
+        self.code.positions.append((node.pos_start,node.pos_end))
+        return len(self.code.instructions)-1
+
+    def patch(self,index,arg):
+        op,_ = self.code.instructions[index]
+        self.code.instructions[index] = (op,arg)
+
+    def here(self):
+        return len(self.code.instructions)
+
+    def compile(self,node):
+        method_name = f"compile_{type(node).__name__}"
+        method = getattr(self,method_name,self.no_compile_method)
+        method(node)
+
+    def no_compile_method(self,node):
+        raise Exception(f"No compile_{type(node).__name__} method defined")
+
+    def compile_block(self,node):
+        # statement blocks only matter for their side effects, their values are never observed
+        for statement_node in node.statement_nodes:
+            self.compile(statement_node)
+            self.emit(OP_POP,None,statement_node)
+
+    def compile_NumberNode(self,node):
+        self.emit(OP_LOAD_CONST,node.value,node)
+
+    def compile_StringNode(self,node):
+        self.emit(OP_LOAD_CONST,node.value,node)
+
+    def compile_VarAccessNode(self,node):
+        self.emit(OP_LOAD_NAME,node.var_name_tok.value,node)
+
+    def compile_VarAssignNode(self,node):
+        self.compile(node.value_node)
+        self.emit(OP_STORE_NAME,node.var_name_tok.value,node)
+
+    def compile_ObjectAccessNode(self,node):
+        self.compile(node.obj_node)
+        self.emit(OP_LOAD_ATTR,node.var_name_tok.value,node)
+
+    def compile_ObjectAssignNode(self,node):
+        self.emit(OP_LOAD_ATTR_TARGET,(node.obj_name_tok.value,node.var_name_tok.value),node)
+        self.compile(node.value_node)
+        self.emit(OP_STORE_ATTR,node.var_name_tok.value,node)
+
+    def compile_BinOpNode(self,node):
+        self.compile(node.left_node)
+        self.compile(node.right_node)
+        # errors are placed over both operands or just the right one, so remember where it starts
+        # the last field says whether the instruction may still be quickened
+        self.emit(OP_BINARY_OP,(BINARY_METHODS[node.op_tok.type],node.right_node.pos_start,True),node)
+
+    def compile_LogicalOpNode(self,node):
+        method = BINARY_METHODS[node.op_tok.type]
+        self.compile(node.left_node)
+        short_circuit = self.emit(OP_SHORT_CIRCUIT,None,node)
+        self.compile(node.right_node)
+        self.emit(OP_BINARY_OP,(method,node.right_node.pos_start,False),node)
+        self.patch(short_circuit,(method,self.here()))
+
+    def compile_UnaryOpNode(self,node):
+        self.compile(node.node)
+        if node.op_tok.type == TT_MINUS:
+            op = UNARY_MINUS
+        elif node.op_tok.type == TT_NOT or node.op_tok.type == TT_KW_NOT:
+            op = UNARY_NOT
+        else:
+            op = UNARY_PLUS
+        self.emit(OP_UNARY_OP,(op,node.node.pos_start),node)
+
+    def compile_case(self,expr,should_return_null):
+        if should_return_null:
+            self.compile_block(expr)
+            self.emit(OP_LOAD_NULL,None,expr)
+        else:
+            self.compile(expr)
+
+    def compile_IfNode(self,node):
+        end_jumps = []
+        for condition,expr,should_return_null in node.cases:
+            self.compile(condition)
+            next_jump = self.emit(OP_POP_JUMP_IF_FALSE,None,condition)
+            self.compile_case(expr,should_return_null)
+            end_jumps.append(self.emit(OP_JUMP,None,node))
+            self.patch(next_jump,self.here())
+
+        if node.else_case:
+            expr,should_return_null = node.else_case
+            self.compile_case(expr,should_return_null)
+        else:
+            self.emit(OP_LOAD_NULL,None,node)
+
+        for jump in end_jumps:
+            self.patch(jump,self.here())
+
+    def compile_loop_body(self,node):
+        if node.should_return_null:
+            self.compile_block(node.body_node)
+        elif not node.used:
+            self.compile(node.body_node)
+            self.emit(OP_POP,None,node.body_node)
+        else:
+            self.compile(node.body_node)
+            self.emit(OP_LIST_APPEND,None,node.body_node)
+
+    def compile_ForNode(self,node):
+        self.compile(node.start_value_node)
+        self.compile(node.end_value_node)
+        if node.step_value_node:
+            self.compile(node.step_value_node)
+        else:
+            self.emit(OP_LOAD_CONST,make_number(1),node)
+        self.emit(OP_FOR_PREP,None,node)
+        setup = self.emit(OP_SETUP_LOOP,None,node)
+        head = self.here()
+        for_iter = self.emit(OP_FOR_ITER,None,node)
+        self.compile_loop_body(node)
+        self.emit(OP_JUMP,head,node)
+        end = self.here()
+        self.patch(setup,(end,head))
+        self.patch(for_iter,(node.var_name_tok.value,end))
+        self.emit(OP_LOOP_END,node.should_return_null or not node.used,node)
+
+    def compile_WhileNode(self,node):
+        self.emit(OP_WHILE_PREP,None,node)
+        setup = self.emit(OP_SETUP_LOOP,None,node)
+        head = self.here()
+        self.compile(node.condition_node)
+        exit_jump = self.emit(OP_POP_JUMP_IF_FALSE,None,node.condition_node)
+        self.compile_loop_body(node)
+        self.emit(OP_JUMP,head,node)
+        end = self.here()
+        self.patch(setup,(end,head))
+        self.patch(exit_jump,end)
+        self.emit(OP_LOOP_END,node.should_return_null or not node.used,node)
+
+    def compile_FuncDefNode(self,node):
+        func_name = node.var_name_tok.value if node.var_name_tok else None
+        code = Compiler(func_name or "<anonymus>").compile_function(node)
+        arg_names = tuple(argname.value for argname in node.arg_name_toks)
+        self.emit(OP_MAKE_FUNCTION,(func_name,code,arg_names,node.should_auto_return),node)
+
+    def compile_CallNode(self,node):
+        arg_count = len(node.arg_nodes)
+        if type(node.node_to_call) == ObjectAccessNode:
+            # a method call passes the object along as 'this'
+            self.compile(node.node_to_call.obj_node)
+            self.emit(OP_LOAD_METHOD,node.node_to_call.var_name_tok.value,node.node_to_call)
+            arg_count += 1
+        else:
+            self.compile(node.node_to_call)
+        for arg_node in node.arg_nodes:
+            self.compile(arg_node)
+        self.emit(OP_TAIL_CALL if node.tail else OP_CALL,arg_count,node)
+
+    def compile_InlinedCallNode(self,node):
+        self.compile(node.call_node)
+
+    def compile_ListNode(self,node):
+        for element_node in node.element_nodes:
+            self.compile(element_node)
+        self.emit(OP_BUILD_LIST,len(node.element_nodes),node)
+
+    def compile_BlockNode(self,node):
+        last = len(node.statement_nodes)-1
+        for i,statement_node in enumerate(node.statement_nodes):
+            self.compile(statement_node)
+            if i != last: self.emit(OP_POP,None,statement_node)
+
+    def compile_ObjectNode(self,node):
+        names = []
+        for name,var_node in node.vars.items():
+            self.compile(var_node)
+            names.append(name.value)
+        self.emit(OP_BUILD_OBJECT,tuple(names),node)
+
+    def compile_ReturnNode(self,node):
+        if node.node_to_return:
+            self.compile(node.node_to_return)
+        else:
+            self.emit(OP_LOAD_NULL,None,node)
+        self.emit(OP_RETURN_VALUE,None,node)
+
+    def compile_ContinueNode(self,node):
+        self.emit(OP_CONTINUE_LOOP,None,node)
+
+    def compile_BreakNode(self,node):
+        self.emit(OP_BREAK_LOOP,None,node)
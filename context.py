@@ -3,4 +3,10 @@ class Context:
         self.display_name = display_name
         self.parent = parent
         self.parent_entry_pos = None
-        self.symbol_table = None
\ No newline at end of file
+        self.symbol_table = None
+        # the table at the bottom of this execution, inline caches are only valid within one execution
+        self.global_table = parent.global_table if parent != None else None
+        # set once a function value captured this context or one below it, its frame can't be reused then
+        self.escaped = False
+        # arguments of the inlined call being evaluated here, its body has no calls so one is enough
+        self.inline_args = None
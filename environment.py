@@ -0,0 +1,20 @@
+from values import *
+from symboltable import GlobalSymbolTable
+from args import BUILTIN_ARGS,BUILTIN_OBJS
+
+class Environment:
+    def __init__(self):
+        self.builtins = GlobalSymbolTable()
+        self.builtins.set("null",Number.null)
+        self.builtins.set("true",Number.true)
+        self.builtins.set("false",Number.false)
+
+        for name in BUILTIN_ARGS.keys():
+            if not "_" in name:
+                self.builtins.set(name,BuiltInFunction(name))
+        for obj in BUILTIN_OBJS.keys():
+            self.builtins.set(obj,BuiltInObject(obj))
+        self.builtins.shared = True
+
+    def scope(self):
+        return GlobalSymbolTable(self.builtins)
@@ -49,6 +49,16 @@ class RTError(Error):
             
         return "Traceback (most recent call last):\n"+result
     
+class OperationError:
+    # values don't know where they came from, so operations only say what went wrong and the
+    # node or instruction evaluating them places it over both operands or just the right one
+    def __init__(self,details,right_only=False):
+        self.details = details
+        self.right_only = right_only
+        
+    def locate(self,left_start,right_start,right_end,context):
+        return RTError(right_start if self.right_only else left_start,right_end,self.details,context)
+    
 class ExitError(Error):
     def __init__(self,details):
         super().__init__(None, None, "Program quitted", details)
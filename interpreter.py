@@ -1,321 +1,399 @@
 from values import *
 from tokens import *
+from nodes import ObjectAccessNode
 from runtime import *
+from symboltable import local_names,bind_local
 import values
 
 class Interpreter:
     def __init__(self):
-        pass
+        self.visitors = {}
 
     def visit(self, node, context):
-        method_name = f"visit_{type(node).__name__}"
-        method = getattr(self, method_name, self.no_visit_method)
+        method = self.visitors.get(type(node))
+        if method == None: method = self.visitor(node)
         return method(node, context)
 
+    def visitor(self, node):
+        method = self.visitors.get(type(node))
+        if method == None:
+            method = self.visitors[type(node)] = getattr(self, f"visit_{type(node).__name__}", self.no_visit_method)
+        return method
+
     def no_visit_method(self, node, context):
         raise Exception(f"No visit_{type(node).__name__} method defined")
 
     def visit_VarAccessNode(self, node, context):
-        res = RTResult()
         var_name = node.var_name_tok.value
-        value = context.symbol_table.get(var_name)
+        cache = node.cache
+        if node.slot != None:
+            symbol_table = context.symbol_table
+            value = symbol_table.slots[node.slot]
+            if value == None and symbol_table.parent:
+                value = symbol_table.parent.get(var_name)
+        elif cache != None and cache[0] == SymbolTable.version and cache[1] is context.global_table:
+            value = cache[2]
+        else:
+            value = context.symbol_table.get(var_name)
+            if value != None and not var_name in local_names:
+                # threads may run the same tree on other tables, the entry only holds for this one
+                node.cache = (SymbolTable.version,context.global_table,value)
 
         if not value:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"'{var_name}' is not defined", context
             ))
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
-        return res.success(value)
+        # values are shared, positions and context come from the node that uses them
+        return value
 
     def visit_VarAssignNode(self, node, context):
-        res = RTResult()
         var_name = node.var_name_tok.value
-        value = res.register(self.visit(node.value_node, context))
-        if res.should_return(): return res
+        value = self.visit(node.value_node, context)
+
+        if node.slot != None:
+            context.symbol_table.slots[node.slot] = value
+        else:
+            context.symbol_table.set(var_name, value)
+        return value
 
-        context.symbol_table.set(var_name, value)
-        return res.success(value)
-    
     def visit_ObjectAccessNode(self, node, context):
-        res = RTResult()
+        return self.get_attribute(node,self.visit(node.obj_node,context),context)
+
+    def get_attribute(self, node, obj, context):
         var_name = node.var_name_tok.value
-        obj = res.register(self.visit(node.obj_node,context))
-        if res.should_return(): return res
-        
+
         if not obj:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"Object is not defined", context
             ))
 
         if not isinstance(obj,Object):
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"Expression should be an object", context
             ))
-            
+
         value = obj.vars.get(var_name,None)
-            
+
         if not value:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"Object has no attribute '{var_name}'", context
             ))
 
-        value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context).set_obj(obj)
-        return res.success(value)
+        return value
 
     def visit_ObjectAssignNode(self, node, context):
-        res = RTResult()
         obj_name = node.obj_name_tok.value
         var_name = node.var_name_tok.value
-        
+
         obj = context.symbol_table.get(obj_name)
-        
+
         if not obj:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"'{obj_name}' is not defined", context
             ))
-            
+
         if not isinstance(obj,Object):
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"'{obj_name}' should be an object", context
             ))
-            
+
         if var_name in obj.vars.keys():
-        
-            value = res.register(self.visit(node.value_node, context))
-            if res.should_return(): return res
-            value = value.copy().set_pos(node.pos_start, node.pos_end).set_context(context)
+            if not isinstance(obj.vars,dict):
+                obj = context.symbol_table.get_private(obj_name)
+                obj.own_vars()
+
+            value = self.visit(node.value_node, context)
             obj.vars[var_name] = value
-            return res.success(value)
+            return value
         else:
-            return res.failure(RTError(
+            raise RuntimeFailure(RTError(
                 node.pos_start, node.pos_end,
                 f"'{obj_name}' has no attribute '{var_name}'", context
             ))
 
     def visit_NumberNode(self, node, context):
-        return RTResult().success(Number(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end))
-    
+        return node.value
+
     def visit_StringNode(self, node, context):
-        return RTResult().success(String(node.tok.value).set_context(context).set_pos(node.pos_start, node.pos_end))
+        return node.value
 
     def visit_BinOpNode(self, node, context):
-        res = RTResult()
-        left = res.register(self.visit(node.left_node, context))
-        if res.should_return(): return res
-        right = res.register(self.visit(node.right_node, context))
-        if res.should_return(): return res
+        left = self.visit(node.left_node, context)
+        right = self.visit(node.right_node, context)
+        quick = node.quick
+        if quick:
+            result = quick(left, right)
+            if result != None: return result
+            # the operand types changed, the site goes back to the generic path for good
+            node.quick = False
+
+        result, error = self.binary_op(node.op_tok.type, left, right)
+        if error:
+            raise RuntimeFailure(error.locate(
+                node.left_node.pos_start, node.right_node.pos_start, node.right_node.pos_end, context
+            ))
+        if quick == None:
+            node.quick = quickened(BINARY_METHODS[node.op_tok.type], left, right) or False
+        return result
+
+    def visit_LogicalOpNode(self, node, context):
+        left = self.visit(node.left_node, context)
+        method = BINARY_METHODS[node.op_tok.type]
+        result = short_circuit(method, left)
+        if result != None: return result
+
+        right = self.visit(node.right_node, context)
+        result, error = getattr(left, method)(right)
+        if error:
+            raise RuntimeFailure(error.locate(
+                node.left_node.pos_start, node.right_node.pos_start, node.right_node.pos_end, context
+            ))
+        return result
+
+    def binary_op(self, op_type, left, right):
         error = None
-        if node.op_tok.type == TT_PLUS:
+        if op_type == TT_PLUS:
             result, error = left.added_to(right)
-        elif node.op_tok.type == TT_MINUS:
+        elif op_type == TT_MINUS:
             result, error = left.subbed_by(right)
-        elif node.op_tok.type == TT_MUL:
+        elif op_type == TT_MUL:
             result, error = left.multed_by(right)
-        elif node.op_tok.type == TT_DIV:
+        elif op_type == TT_DIV:
             result, error = left.dived_by(right)
-        elif node.op_tok.type == TT_POW:
+        elif op_type == TT_POW:
             result, error = left.powed_by(right)
-        elif node.op_tok.type == TT_EE:
+        elif op_type == TT_EE:
             result, error = left.get_comparison_eq(right)
-        elif node.op_tok.type == TT_NE:
+        elif op_type == TT_NE:
             result, error = left.get_comparison_ne(right)
-        elif node.op_tok.type == TT_LT:
+        elif op_type == TT_LT:
             result, error = left.get_comparison_lt(right)
-        elif node.op_tok.type == TT_GT:
+        elif op_type == TT_GT:
             result, error = left.get_comparison_gt(right)
-        elif node.op_tok.type == TT_LTE:
+        elif op_type == TT_LTE:
             result, error = left.get_comparison_lte(right)
-        elif node.op_tok.type == TT_GTE:
+        elif op_type == TT_GTE:
             result, error = left.get_comparison_gte(right)
-        elif node.op_tok.type == TT_AND or node.op_tok.matches(TT_KEYWORD,"and"):
+        elif op_type == TT_AND or op_type == TT_KW_AND:
             result, error = left.anded_by(right)
-        elif node.op_tok.type == TT_OR or node.op_tok.matches(TT_KEYWORD,"or"):
+        elif op_type == TT_OR or op_type == TT_KW_OR:
             result, error = left.ored_by(right)
-        if error:
-            return res.failure(error)
-        return res.success(result.set_pos(node.pos_start,node.pos_end))
-        
+        return result, error
+
     def visit_UnaryOpNode(self,node,context):
-        res = RTResult()
-        number = res.register(self.visit(node.node,context))
-        if res.should_return():return res
+        value = self.visit(node.node,context)
+        number, error = self.unary_op(node.op_tok.type, value)
+        if error:
+            raise RuntimeFailure(error.locate(
+                node.node.pos_start, node.node.pos_start, node.node.pos_end, context
+            ))
+
+        return number
+
+    def unary_op(self, op_type, number):
         error = None
-        if node.op_tok.type == TT_MINUS:
-            number,error = number.multed_by(Number(-1))
-        elif node.op_tok.type == TT_NOT or node.op_tok.matches(TT_KEYWORD,"not"):
+        if op_type == TT_MINUS:
+            number,error = number.multed_by(make_number(-1))
+        elif op_type == TT_NOT or op_type == TT_KW_NOT:
             number,error = number.notted()
-            
-        if error:
-            return res.failure(error)
-            
-        return res.success(number.set_pos(node.pos_start,node.pos_end))
-    
+        return number, error
+
     def visit_IfNode(self,node,context):
-        res = RTResult()
-        
         for condition,expr,should_return_null in node.cases:
-            condition_value = res.register(self.visit(condition,context))
-            if res.should_return(): return res
-            
+            condition_value = self.visit(condition,context)
+
             if condition_value.is_true():
-                expr_value = res.register(self.visit(expr,context))
-                if res.should_return(): return res
-                return res.success(Number.null if should_return_null else expr_value)
-        
+                expr_value = self.visit(expr,context)
+                return Number.null if should_return_null else expr_value
+
         if node.else_case:
             expr,should_return_null = node.else_case
-            else_value = res.register(self.visit(expr,context))
-            if res.should_return(): return res
-            return res.success(Number.null if should_return_null else else_value)
-        
-        return res.success(Number.null)
-    
+            else_value = self.visit(expr,context)
+            return Number.null if should_return_null else else_value
+
+        return Number.null
+
     def visit_ForNode(self,node,context):
-        res = RTResult()
         elements = []
-        
-        start_value = res.register(self.visit(node.start_value_node,context))
-        if res.should_return(): return res
-        
-        end_value = res.register(self.visit(node.end_value_node,context))
-        if res.should_return(): return res
-        
+
+        start_value = self.visit(node.start_value_node,context)
+        end_value = self.visit(node.end_value_node,context)
+
         if node.step_value_node:
-            step_value = res.register(self.visit(node.step_value_node,context))
-            if res.should_return(): return res
+            step_value = self.visit(node.step_value_node,context)
         else:
-            step_value = Number(1)
-            
-        i = start_value.value
-        
-        if step_value.value >= 0:
-            condition = lambda: i < end_value.value
+            step_value = make_number(1)
+
+        start,end,step = start_value.value,end_value.value,step_value.value
+        if type(start) == int and type(end) == int and type(step) == int and step != 0:
+            steps = range(start,end,step)
         else:
-            condition = lambda: i > end_value.value
-            
-        while condition():
-            context.symbol_table.set(node.var_name_tok.value,Number(i))
-            i+= step_value.value
-            
-            value = res.register(self.visit(node.body_node,context))
-            if res.should_return() and res.loop_should_continue == False and res.loop_should_break == False: return res
-            
-            if res.loop_should_continue:
-                continue
-            if res.loop_should_break:
-                break
-            
-            elements.append(value)
-            
-        return res.success(
-            Number.null if  node.should_return_null else
-            List(elements).set_context(context).set_pos(node.pos_start,node.pos_end)
-            )
-    
+            steps = count_steps(start,end,step)
+
+        body_node = node.body_node
+        visit_body = self.visitor(body_node)
+        collect = node.used and not node.should_return_null
+        symbol_table = context.symbol_table
+        observed = node.observed
+        slot = node.slot
+        i = None
+        try:
+            for i in steps:
+                if observed:
+                    if slot != None:
+                        symbol_table.slots[slot] = make_number(i)
+                    else:
+                        symbol_table.set(node.var_name_tok.value,make_number(i))
+
+                try:
+                    value = visit_body(body_node,context)
+                except LoopContinue:
+                    continue
+                except LoopBreak:
+                    break
+
+                if collect: elements.append(value)
+        finally:
+            # nothing in the body can see the variable, it only needs the value the loop stopped at
+            if not observed and i != None:
+                if slot != None:
+                    symbol_table.slots[slot] = make_number(i)
+                else:
+                    symbol_table.set(node.var_name_tok.value,make_number(i))
+
+        return List(elements) if collect else Number.null
+
     def visit_WhileNode(self,node,context):
-        res = RTResult()
         elements = []
-        
+        collect = node.used and not node.should_return_null
+
         while True:
-            condition = res.register(self.visit(node.condition_node,context))
-            if res.should_return(): return res
-            
+            condition = self.visit(node.condition_node,context)
+
             if not condition.is_true(): break
-            
-            value = res.register(self.visit(node.body_node,context))
-            if res.should_return() and res.loop_should_continue == False and res.loop_should_break == False: return res
-            
-            if res.loop_should_continue:
+
+            try:
+                value = self.visit(node.body_node,context)
+            except LoopContinue:
                 continue
-            if res.loop_should_break:
+            except LoopBreak:
                 break
-            
-            elements.append(value)
-            
-        return res.success(Number.null if  node.should_return_null else List(elements).set_context(context).set_pos(node.pos_start,node.pos_end))
-    
+
+            if collect: elements.append(value)
+
+        return List(elements) if collect else Number.null
+
     def visit_FuncDefNode(self,node,context):
-        res = RTResult()
-        
         func_name = node.var_name_tok.value if node.var_name_tok else None
         body_node = node.body_node
         arg_names = [argname.value for argname in node.arg_name_toks]
-        func_value = Function(func_name,body_node,arg_names,node.should_auto_return).set_context(context).set_pos(node.pos_start,node.pos_end)
-        
+        if node.layout != None and not node.layout.keys() <= local_names:
+            bind_local(*node.layout)
+        # the new function keeps this context, so neither it nor its callers' frames may be reused
+        frame = context
+        while frame != None and not frame.escaped:
+            frame.escaped = True
+            frame = frame.parent
+        func_value = Function(func_name,body_node,arg_names,node.should_auto_return,node.layout).set_context(context).set_pos(node.pos_start,node.pos_end)
+
         if node.var_name_tok:
             context.symbol_table.set(func_name,func_value)
-            
-        return res.success(func_value)
-    
+
+        return func_value
+
     def visit_CallNode(self,node,context):
-        res = RTResult()
         args = []
-        
-        value_to_call = res.register(self.visit(node.node_to_call,context))
-        if res.should_return(): return res
-        if value_to_call.parent_obj:
-            args.append(value_to_call.parent_obj)
-        value_to_call = value_to_call.copy().set_pos(node.pos_start,node.pos_end)
+
+        if type(node.node_to_call) == ObjectAccessNode:
+            # a method call passes the object along as 'this'
+            obj = self.visit(node.node_to_call.obj_node,context)
+            value_to_call = self.get_attribute(node.node_to_call,obj,context)
+            args.append(obj)
+        else:
+            value_to_call = self.visit(node.node_to_call,context)
+        for arg_node in node.arg_nodes:
+            args.append(self.visit(arg_node,context))
+
+        if node.tail:
+            return TailCall(value_to_call,args,node.pos_start,node.pos_end)
+        return value_to_call.call_at(args,context,node.pos_start,node.pos_end)
+
+    def visit_InlinedCallNode(self,node,context):
+        args = []
         for arg_node in node.arg_nodes:
-            args.append(res.register(self.visit(arg_node,context)))
-            if res.should_return(): return res
-            
-        return_value = res.register(value_to_call.execute(args))
-        if res.should_return(): return res
-        return_value = return_value.copy().set_pos(node.pos_start,node.pos_end).set_context(context)
-        return res.success(return_value)
-    
+            args.append(self.visit(arg_node,context))
+
+        context.inline_args = args
+        try:
+            return self.visit(node.body_node,context)
+        except RuntimeFailure as failure:
+            # the body runs in the caller's context, the traceback still names the function it came from
+            failure.error.context = Context(node.func_name,context)
+            raise
+
+    def visit_InlinedArgNode(self,node,context):
+        return context.inline_args[node.index]
+
     def visit_ListNode(self,node,context):
-        res = RTResult()
         elements = []
-        
+
         for element_node in node.element_nodes:
-            elements.append(res.register(self.visit(element_node,context)))
-            if res.should_return(): return res
-            
-        return res.success(List(elements).set_context(context).set_pos(node.pos_start,node.pos_end))
-    
+            elements.append(self.visit(element_node,context))
+
+        return List(elements)
+
+    def visit_BlockNode(self,node,context):
+        value = Number.null
+        for statement_node in node.statement_nodes:
+            value = self.visit(statement_node,context)
+        return value
+
     def visit_ObjectNode(self,node,context):
-        res = RTResult()
         vars = {}
-        
+
         for name,var_node in node.vars.items():
-            vars[name.value] = res.register(self.visit(var_node,context))
-            if res.should_return(): return res
-            
-        obj = Object(vars).set_context(context).set_pos(node.pos_start,node.pos_end).finish()
-        res.register(obj.check(context))
-        if res.should_return(): return res
-        
+            vars[name.value] = self.visit(var_node,context)
+
+        obj = Object(vars).finish()
+        error = obj.check(node.pos_start,node.pos_end,context)
+        if error: raise RuntimeFailure(error)
+
         for name,var in obj.vars.items():
             if name == "main":
-                res.register(var.execute([obj]))
-                if res.should_return(): return res
-            
-        return res.success(obj)
-    
+                var.call_at([obj],context,var.pos_start,var.pos_end)
+
+        return obj
+
     def visit_ReturnNode(self,node,context):
-        res = RTResult()
-        
         if node.node_to_return:
-            value = res.register(self.visit(node.node_to_return,context))
-            if res.should_return(): return res
+            value = self.visit(node.node_to_return,context)
         else:
             value = Number.null
-            
-        return res.success_return(value)
-    
+
+        raise FunctionReturn(value)
+
     def visit_ContinueNode(self,node,context):
-        return RTResult().success_continue()
-    
+        raise LoopContinue()
+
     def visit_BreakNode(self,node,context):
-        return RTResult().success_break()
-        
-values.interpreter = Interpreter
\ No newline at end of file
+        raise LoopBreak()
+
+def count_steps(i,end,step):
+    # non integer bounds, and a step of 0 which never ends, step the way the language always did
+    if step >= 0:
+        while i < end:
+            yield i
+            i += step
+    else:
+        while i > end:
+            yield i
+            i += step
+
+values.interpreter = Interpreter()
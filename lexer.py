@@ -1,7 +1,7 @@
 from tokens import *
 from errors import *
 from position import *
-import string
+import string, re, os, mmap
 
 DIGITS = "0123456789"
 LETTERS = string.ascii_letters
@@ -10,8 +10,9 @@ LETTERS_DIGITS = LETTERS+DIGITS
 class Lexer:
     def __init__(self,fn,text):
         self.fn = fn
-        self.text = text
-        self.pos = Position(-1,0,-1,fn,text)
+        self.text = text if isinstance(text,str) else text[:].decode()
+        self.pos = Position(-1,0,-1,fn,self.text)
+        self.error = None
         self.current_char = None
         self.advance()
         
@@ -20,86 +21,89 @@ class Lexer:
         self.current_char = self.text[self.pos.idx] if self.pos.idx < len(self.text) else None
         
     def make_tokens(self):
-        tokens = []
-        
+        tokens = list(self.iter_tokens())
+        if self.error: return [], self.error
+        return tokens,None
+    
+    def iter_tokens(self):
         while self.current_char != None:
             if self.current_char in ' \t':
                 self.advance()
             elif self.current_char == "#":
                 self.skip_comment()
             elif self.current_char in ";\n":
-                tokens.append(Token(TT_NEWLINE,pos_start=self.pos))
+                yield Token(TT_NEWLINE,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char in DIGITS:
-                tokens.append(self.make_number())
+                yield self.make_number()
             elif self.current_char in LETTERS:
-                tokens.append(self.make_identifier())
+                yield self.make_identifier()
             elif self.current_char == '"':
-                tokens.append(self.make_string())
+                yield self.make_string()
             elif self.current_char == ".":
-                tokens.append(Token(TT_DOT,pos_start=self.pos))
+                yield Token(TT_DOT,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "+":
-                tokens.append(Token(TT_PLUS,pos_start=self.pos))
+                yield Token(TT_PLUS,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "-":
-                tokens.append(Token(TT_MINUS,pos_start=self.pos))
+                yield Token(TT_MINUS,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "*":
-                tokens.append(Token(TT_MUL,pos_start=self.pos))
+                yield Token(TT_MUL,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "/":
-                tokens.append(Token(TT_DIV,pos_start=self.pos))
+                yield Token(TT_DIV,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "^":
-                tokens.append(Token(TT_POW,pos_start=self.pos))
+                yield Token(TT_POW,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "(":
-                tokens.append(Token(TT_LPAREN,pos_start=self.pos))
+                yield Token(TT_LPAREN,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == ")":
-                tokens.append(Token(TT_RPAREN,pos_start=self.pos))
+                yield Token(TT_RPAREN,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "[":
-                tokens.append(Token(TT_LSQUARE,pos_start=self.pos))
+                yield Token(TT_LSQUARE,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "]":
-                tokens.append(Token(TT_RSQUARE,pos_start=self.pos))
+                yield Token(TT_RSQUARE,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "{":
-                tokens.append(Token(TT_LBRACE,pos_start=self.pos))
+                yield Token(TT_LBRACE,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "}":
-                tokens.append(Token(TT_RBRACE,pos_start=self.pos))
+                yield Token(TT_RBRACE,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "&":
-                tokens.append(Token(TT_AND,pos_start=self.pos))
+                yield Token(TT_AND,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "|":
-                tokens.append(Token(TT_OR,pos_start=self.pos))
+                yield Token(TT_OR,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == ":":
-                tokens.append(Token(TT_COLON,pos_start=self.pos))
+                yield Token(TT_COLON,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == ",":
-                tokens.append(Token(TT_COMMA,pos_start=self.pos))
+                yield Token(TT_COMMA,pos_start=self.pos.copy())
                 self.advance()
             elif self.current_char == "!":
-                tokens.append(self.make_not_equals())
+                yield self.make_not_equals()
             elif self.current_char == "=":
-                tokens.append(self.make_equals())
+                yield self.make_equals()
             elif self.current_char == "<":
-                tokens.append(self.make_less_than())
+                yield self.make_less_than()
             elif self.current_char == ">":
-                tokens.append(self.make_greater_than())
+                yield self.make_greater_than()
             else:
                 pos_start = self.pos.copy()
                 char = self.current_char
                 self.advance()
-                return [], IllegalCharError(pos_start,self.pos.copy(),f"'{char}'")
+                self.error = IllegalCharError(pos_start,self.pos.copy(),f"'{char}'")
+                break
         
-        tokens.append(Token(TT_EOF,pos_start=self.pos))
-        return tokens,None
+        yield Token(TT_EOF,pos_start=self.pos.copy())
     
     def make_number(self):
         num_str = ""
@@ -116,9 +120,9 @@ class Lexer:
             self.advance()
         
         if dot_count == 0:
-            return Token(TT_INT,int(num_str),pos_start,self.pos)
+            return Token(TT_INT,int(num_str),pos_start,self.pos.copy())
         else:
-            return Token(TT_FLOAT,float(num_str),pos_start,self.pos)
+            return Token(TT_FLOAT,float(num_str),pos_start,self.pos.copy())
         
     def make_identifier(self):
         id_str = ""
@@ -128,8 +132,8 @@ class Lexer:
             id_str +=self.current_char
             self.advance()
             
-        tok_type = TT_KEYWORD if id_str in KEYWORDS else TT_IDENTIFIER
-        return Token(tok_type,id_str,pos_start,self.pos)
+        tok_type = KEYWORDS.get(id_str,TT_IDENTIFIER)
+        return Token(tok_type,id_str,pos_start,self.pos.copy())
     
     def make_not_equals(self):
         pos_start = self.pos.copy()
@@ -137,7 +141,7 @@ class Lexer:
         self.advance()
         if self.current_char == "=":
             self.advance()
-            return Token(TT_NE,pos_start=pos_start,pos_end=self.pos)
+            return Token(TT_NE,pos_start=pos_start,pos_end=self.pos.copy())
         
         #self.advance()
         return Token(TT_NOT,pos_start=pos_start)
@@ -154,7 +158,7 @@ class Lexer:
             self.advance()
             tok_type = TT_ARROW
             
-        return Token(tok_type,pos_start=pos_start,pos_end=self.pos)
+        return Token(tok_type,pos_start=pos_start,pos_end=self.pos.copy())
     
     def make_less_than(self):
         tok_type = TT_LT
@@ -165,7 +169,7 @@ class Lexer:
             self.advance()
             tok_type = TT_LTE
             
-        return Token(tok_type,pos_start=pos_start,pos_end=self.pos)
+        return Token(tok_type,pos_start=pos_start,pos_end=self.pos.copy())
     
     def make_greater_than(self):
         tok_type = TT_GT
@@ -176,7 +180,7 @@ class Lexer:
             self.advance()
             tok_type = TT_GTE
             
-        return Token(tok_type,pos_start=pos_start,pos_end=self.pos)
+        return Token(tok_type,pos_start=pos_start,pos_end=self.pos.copy())
     
     def make_string(self):
         string = ""
@@ -201,7 +205,7 @@ class Lexer:
             escape_char = False
             
         self.advance()
-        return Token(TT_STRING,string,pos_start,self.pos)
+        return Token(TT_STRING,string,pos_start,self.pos.copy())
     
     def skip_comment(self):
         self.advance()
@@ -209,4 +213,100 @@ class Lexer:
         while self.current_char != "\n":
             self.advance()
             
-        self.advance()
\ No newline at end of file
+        self.advance()
+
+TOKEN_REGEX = re.compile(r"""
+     (?P<skip>[ \t]+|\#[^\n]*\n?)
+    |(?P<number>[0-9]+(?P<fraction>\.[0-9]*)?)
+    |(?P<identifier>[A-Za-z][A-Za-z0-9_]*)
+    |(?P<string>"[^"]*"?)
+    |(?P<operator>!=|==|=>|<=|>=|[;\n.+\-*/^()\[\]{}&|:,!=<>])
+""",re.VERBOSE)
+TOKEN_REGEX_BYTES = re.compile(TOKEN_REGEX.pattern.encode(),re.VERBOSE)
+
+OPERATOR_TYPES = {
+    ";":TT_NEWLINE,"\n":TT_NEWLINE,".":TT_DOT,
+    "+":TT_PLUS,"-":TT_MINUS,"*":TT_MUL,"/":TT_DIV,"^":TT_POW,
+    "(":TT_LPAREN,")":TT_RPAREN,"[":TT_LSQUARE,"]":TT_RSQUARE,"{":TT_LBRACE,"}":TT_RBRACE,
+    "&":TT_AND,"|":TT_OR,":":TT_COLON,",":TT_COMMA,
+    "!":TT_NOT,"!=":TT_NE,"=":TT_EQ,"==":TT_EE,"=>":TT_ARROW,
+    "<":TT_LT,"<=":TT_LTE,">":TT_GT,">=":TT_GTE,
+}
+OPERATOR_TYPES_BYTES = {op.encode():type_ for op,type_ in OPERATOR_TYPES.items()}
+
+MMAP_THRESHOLD = 1 << 20
+
+def read_source(fn):
+    with open(fn,"rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size >= MMAP_THRESHOLD:
+            data = mmap.mmap(f.fileno(),0,access=mmap.ACCESS_READ)
+            # offsets double as character indices and text mode would translate newlines,
+            # so only plain ascii sources without carriage returns can stay as bytes
+            if re.search(rb"[\x80-\xff\r]",data) == None:
+                return data
+            data.close()
+    with open(fn,"r") as f:
+        return f.read()
+
+class RegexLexer:
+    def __init__(self,fn,text):
+        self.fn = fn
+        self.text = text
+        self.source = Source(fn,text)
+        self.error = None
+
+    def make_tokens(self):
+        tokens = list(self.iter_tokens())
+        if self.error: return [], self.error
+        return tokens,None
+
+    def make_token_buffer(self):
+        buffer = TokenBuffer(self.source)
+        append = buffer.append
+        for kind,value,start,end in self.scan():
+            append(kind,value,start,end)
+        if self.error: return None, self.error
+        return buffer.finish(),None
+
+    def iter_tokens(self):
+        source = self.source
+        for kind,value,start,end in self.scan():
+            yield OffsetToken(kind,value,start,end,source)
+
+    def scan(self):
+        text = self.text
+        source = self.source
+        binary = not isinstance(text,str)
+        match = (TOKEN_REGEX_BYTES if binary else TOKEN_REGEX).match
+        operator_types = OPERATOR_TYPES_BYTES if binary else OPERATOR_TYPES
+        keyword_kind = KEYWORDS.get
+        idx = 0
+        length = len(text)
+
+        while idx < length:
+            m = match(text,idx)
+            if m == None:
+                char = text[idx:idx+1]
+                self.error = IllegalCharError(OffsetPosition(idx,source),OffsetPosition(idx+1,source),f"'{char.decode() if binary else char}'")
+                break
+            kind = m.lastgroup
+            end = m.end()
+            if kind == "operator":
+                yield operator_types[m.group()],None,idx,end
+            elif kind == "identifier":
+                value = m.group().decode() if binary else m.group()
+                yield keyword_kind(value,TT_IDENTIFIER),value,idx,end
+            elif kind == "number":
+                if m.group("fraction") == None:
+                    yield TT_INT,int(m.group()),idx,end
+                else:
+                    yield TT_FLOAT,float(m.group()),idx,end
+            elif kind == "string":
+                value = m.group().decode() if binary else m.group()
+                value = value[1:-1] if len(value) > 1 and value[-1] == '"' else value[1:]
+                # like make_string, backslashes are dropped and never escape the closing quote
+                yield TT_STRING,value.replace("\\",""),idx,end
+            idx = end
+
+        yield TT_EOF,None,idx,idx+1
@@ -1,6 +1,9 @@
+from values import constant
+
 class NumberNode:
     def __init__(self, tok):
         self.tok = tok
+        self.value = constant(tok.value)
         
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
@@ -11,6 +14,7 @@ class NumberNode:
 class StringNode:
     def __init__(self, tok):
         self.tok = tok
+        self.value = constant(tok.value)
         
         self.pos_start = self.tok.pos_start
         self.pos_end = self.tok.pos_end
@@ -25,6 +29,13 @@ class ListNode:
         self.pos_start = pos_start
         self.pos_end = pos_end
         
+class BlockNode:
+    def __init__(self,statement_nodes,pos_start,pos_end):
+        self.statement_nodes = statement_nodes
+        
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+        
 class ObjectNode:
     def __init__(self,vars,pos_start,pos_end):
         self.vars = vars 
@@ -37,6 +48,8 @@ class BinOpNode:
         self.left_node = left_node
         self.op_tok = op_tok
         self.right_node = right_node
+        # the specialized operation for the operand types seen here, False once they turned out to vary
+        self.quick = None
         
         self.pos_start = self.left_node.pos_start
         self.pos_end = self.right_node.pos_end
@@ -44,6 +57,10 @@ class BinOpNode:
     def __repr__(self) -> str:
         return f"({self.left_node}, {self.op_tok}, {self.right_node})"
     
+class LogicalOpNode(BinOpNode):
+    # 'and'/'or', the right operand is only evaluated when the left one doesn't decide the result
+    pass
+
 class UnaryOpNode:
     def __init__(self,op_tok,node):
         self.op_tok = op_tok
@@ -58,6 +75,8 @@ class UnaryOpNode:
 class VarAccessNode:
     def __init__(self,var_name_tok):
         self.var_name_tok = var_name_tok
+        self.slot = None
+        self.cache = None
         
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.var_name_tok.pos_end
@@ -74,6 +93,7 @@ class VarAssignNode:
     def __init__(self,var_name_tok,value_node):
         self.var_name_tok = var_name_tok
         self.value_node = value_node
+        self.slot = None
         
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.value_node.pos_end
@@ -104,6 +124,10 @@ class ForNode:
         self.step_value_node = step_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        self.used = True
+        self.slot = None
+        # whether the body may read or rebind the variable, the resolver clears it when it can't
+        self.observed = True
         
         self.pos_start = self.var_name_tok.pos_start
         self.pos_end = self.body_node.pos_end
@@ -114,6 +138,7 @@ class WhileNode:
         self.condition_node = condition_node
         self.body_node = body_node
         self.should_return_null = should_return_null
+        self.used = True
         
         self.pos_start = self.condition_node.pos_start
         self.pos_end = self.body_node.pos_end
@@ -125,6 +150,7 @@ class FuncDefNode:
         self.arg_name_toks = arg_name_toks
         self.body_node = body_node
         self.should_auto_return = should_auto_return
+        self.layout = None
         
         if self.var_name_tok:
             self.pos_start = self.var_name_tok.pos_start
@@ -139,6 +165,7 @@ class CallNode:
     def __init__(self,node_to_call,arg_nodes):
         self.node_to_call = node_to_call
         self.arg_nodes = arg_nodes
+        self.tail = False
         
         self.pos_start = self.node_to_call.pos_start
         if len(self.arg_nodes) > 0:
@@ -161,5 +188,20 @@ class BreakNode:
     def __init__(self,pos_start,pos_end):
         self.pos_start = pos_start
         self.pos_end = pos_end
+
+class InlinedCallNode:
+    # a call the optimizer replaced by the called function's body, the original call is kept for the vm
+    def __init__(self,call_node,func_name,arg_nodes,body_node):
+        self.call_node = call_node
+        self.func_name = func_name
+        self.arg_nodes = arg_nodes
+        self.body_node = body_node
         
-        
\ No newline at end of file
+        self.pos_start = call_node.pos_start
+        self.pos_end = call_node.pos_end
+        
+class InlinedArgNode:
+    def __init__(self,index,pos_start,pos_end):
+        self.index = index
+        self.pos_start = pos_start
+        self.pos_end = pos_end
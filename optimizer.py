@@ -0,0 +1,295 @@
+from nodes import *
+from tokens import *
+from values import Number,String,short_circuit,BINARY_METHODS
+from interpreter import Interpreter
+from resolver import child_nodes
+import sys, copy
+
+# folding happens whether the code ever runs or not, so results that are costly to build are left to runtime
+MAX_FOLDED_POW = 64
+MAX_FOLDED_STRING = 1024
+# arrow functions with bodies of up to this many nodes get inlined into their call sites
+INLINE_BUDGET = 16
+# bodies made only of these can't bind names, call anything or leave early, so they can run in the caller
+INLINABLE_NODES = (NumberNode,StringNode,VarAccessNode,BinOpNode,UnaryOpNode,IfNode,ListNode,ObjectAccessNode)
+
+def is_constant(node):
+    return isinstance(node,(NumberNode,StringNode))
+
+def constant_node(value,node):
+    # takes the place of the folded node, so errors involving it still point at the whole expression
+    if isinstance(value,String):
+        return StringNode(Token(TT_STRING,value.value,node.pos_start,node.pos_end))
+    return NumberNode(Token(TT_FLOAT if isinstance(value.value,float) else TT_INT,value.value,node.pos_start,node.pos_end))
+
+class Optimizer:
+    # inlines small helper functions, folds constant operations, drops if branches that can never be
+    # taken and statements after a return, skip or stop, anything that could fail at runtime is left as it is
+    def __init__(self):
+        self.interpreter = Interpreter()
+
+    def optimize(self,root):
+        self.inline_sites = self.find_inline_sites(root)
+        root = self.rewrite(root)
+        if self.inline_sites:
+            # the inlined bodies are new to the tree, another pass folds them with their constant arguments
+            self.inline_sites = {}
+            root = self.rewrite(root)
+        return root
+
+    def rewrite(self,root):
+        order = self.walk(root)
+
+        # children come after their parents in order, so walking it backwards optimizes them first
+        self.replaced = {}
+        for node in reversed(order):
+            method = getattr(self,f"optimize_{type(node).__name__}",None)
+            if method == None: continue
+            new_node = method(node)
+            if new_node is not node: self.replaced[id(node)] = new_node
+        root = self.get(root)
+        self.replaced = None
+        return root
+
+    def get(self,node):
+        return self.replaced.get(id(node),node)
+
+    def optimize_ListNode(self,node):
+        node.element_nodes = self.reachable(node.element_nodes)
+        return node
+
+    def optimize_BlockNode(self,node):
+        node.statement_nodes = self.reachable(node.statement_nodes)
+        return node
+
+    def reachable(self,nodes):
+        statements = []
+        for statement in nodes:
+            statement = self.get(statement)
+            statements.append(statement)
+            # only statements can be these, whatever follows them in the block never runs
+            if isinstance(statement,(ReturnNode,ContinueNode,BreakNode)): break
+        return statements
+
+    def optimize_ObjectNode(self,node):
+        for name,var_node in node.vars.items():
+            node.vars[name] = self.get(var_node)
+        return node
+
+    def optimize_BinOpNode(self,node):
+        node.left_node = self.get(node.left_node)
+        node.right_node = self.get(node.right_node)
+        left,right = node.left_node,node.right_node
+        if not is_constant(left) or not is_constant(right): return node
+
+        op_type = node.op_tok.type
+        left,right = left.value,right.value
+        if op_type == TT_POW and isinstance(right,Number) and abs(right.value) > MAX_FOLDED_POW: return node
+        if op_type == TT_MUL and isinstance(left,String) and isinstance(right,Number) and len(left.value)*right.value > MAX_FOLDED_STRING:
+            return node
+        try:
+            result,error = self.interpreter.binary_op(op_type,left,right)
+        except Exception:
+            # operations python itself rejects fail the same way at runtime, they are not folded
+            return node
+        if error or type(result) not in (Number,String): return node
+        return constant_node(result,node)
+
+    def optimize_LogicalOpNode(self,node):
+        left = self.get(node.left_node)
+        if is_constant(left):
+            result = short_circuit(BINARY_METHODS[node.op_tok.type],left.value)
+            if result != None: return constant_node(result,node)
+        return self.optimize_BinOpNode(node)
+
+    def optimize_UnaryOpNode(self,node):
+        node.node = self.get(node.node)
+        if not is_constant(node.node): return node
+        try:
+            result,error = self.interpreter.unary_op(node.op_tok.type,node.node.value)
+        except Exception:
+            return node
+        if error or type(result) not in (Number,String): return node
+        return constant_node(result,node)
+
+    def optimize_VarAssignNode(self,node):
+        node.value_node = self.get(node.value_node)
+        return node
+
+    def optimize_ObjectAssignNode(self,node):
+        node.value_node = self.get(node.value_node)
+        return node
+
+    def optimize_ObjectAccessNode(self,node):
+        node.obj_node = self.get(node.obj_node)
+        return node
+
+    def optimize_IfNode(self,node):
+        cases = []
+        else_case = node.else_case and (self.get(node.else_case[0]),node.else_case[1])
+        for condition,expr,should_return_null in node.cases:
+            condition = self.get(condition)
+            expr = self.get(expr)
+            if is_constant(condition):
+                if not condition.value.is_true(): continue
+                # every case after one that is always taken is unreachable, this one becomes the else
+                else_case = (expr,should_return_null)
+                break
+            cases.append((condition,expr,should_return_null))
+        node.cases = cases
+        node.else_case = else_case
+
+        if not cases and else_case and not else_case[1]: return else_case[0]
+        return node
+
+    def optimize_ForNode(self,node):
+        node.start_value_node = self.get(node.start_value_node)
+        node.end_value_node = self.get(node.end_value_node)
+        if node.step_value_node: node.step_value_node = self.get(node.step_value_node)
+        node.body_node = self.get(node.body_node)
+        return node
+
+    def optimize_WhileNode(self,node):
+        node.condition_node = self.get(node.condition_node)
+        node.body_node = self.get(node.body_node)
+        return node
+
+    def optimize_FuncDefNode(self,node):
+        node.body_node = self.get(node.body_node)
+        return node
+
+    def optimize_CallNode(self,node):
+        node.node_to_call = self.get(node.node_to_call)
+        node.arg_nodes = [self.get(arg_node) for arg_node in node.arg_nodes]
+        func = self.inline_sites.get(id(node))
+        if func == None: return node
+        return self.inline(node,func)
+
+    def optimize_InlinedCallNode(self,node):
+        node.arg_nodes = [self.get(arg_node) for arg_node in node.arg_nodes]
+        node.body_node = self.get(node.body_node)
+        return node
+
+    def find_inline_sites(self,root):
+        # only functions defined once at the top level and never rebound, called by statements after
+        # the definition, so every call site is sure to reach that very function
+        if not isinstance(root,ListNode): return {}
+        bindings = {}
+        nodes = self.walk(root)
+        for node in nodes:
+            names = []
+            if isinstance(node,(VarAssignNode,ForNode)):
+                names.append(node.var_name_tok.value)
+            elif isinstance(node,FuncDefNode):
+                if node.var_name_tok: names.append(node.var_name_tok.value)
+                names.extend(arg_name_tok.value for arg_name_tok in node.arg_name_toks)
+            for name in names:
+                bindings[name] = bindings.get(name,0)+1
+
+        sites = {}
+        funcs = {}
+        for statement in root.element_nodes:
+            for node in self.walk(statement):
+                if (isinstance(node,CallNode) and isinstance(node.node_to_call,VarAccessNode)):
+                    func = funcs.get(node.node_to_call.var_name_tok.value)
+                    if func != None and len(node.arg_nodes) == len(func.arg_name_toks):
+                        sites[id(node)] = func
+            if isinstance(statement,FuncDefNode) and statement.var_name_tok:
+                name = statement.var_name_tok.value
+                if bindings[name] == 1 and self.can_inline(statement): funcs[name] = statement
+        return sites
+
+    def can_inline(self,node):
+        if not node.should_auto_return: return False
+        arg_names = [arg_name_tok.value for arg_name_tok in node.arg_name_toks]
+        if len(set(arg_names)) != len(arg_names): return False
+        body = self.walk(node.body_node)
+        if len(body) > INLINE_BUDGET: return False
+        for body_node in body:
+            if not isinstance(body_node,INLINABLE_NODES): return False
+            if isinstance(body_node,VarAccessNode) and body_node.var_name_tok.value == "this": return False
+        return True
+
+    def inline(self,node,func):
+        params = {}
+        arg_nodes = []
+        for arg_name_tok,arg_node in zip(func.arg_name_toks,node.arg_nodes):
+            if is_constant(arg_node):
+                # constants can't fail or change, they go straight into the body where folding can use them
+                params[arg_name_tok.value] = arg_node.value
+            else:
+                params[arg_name_tok.value] = len(arg_nodes)
+                arg_nodes.append(arg_node)
+        return InlinedCallNode(node,func.var_name_tok.value,arg_nodes,self.clone(func.body_node,params))
+
+    def clone(self,node,params):
+        # copies keep the body's positions, errors inside an inlined call still point into the function
+        if isinstance(node,VarAccessNode) and node.var_name_tok.value in params:
+            param = params[node.var_name_tok.value]
+            if isinstance(param,int):
+                return InlinedArgNode(param,node.pos_start,node.pos_end)
+            return constant_node(param,node)
+        node = copy.copy(node)
+        if isinstance(node,BinOpNode):
+            node.left_node = self.clone(node.left_node,params)
+            node.right_node = self.clone(node.right_node,params)
+        elif isinstance(node,UnaryOpNode):
+            node.node = self.clone(node.node,params)
+        elif isinstance(node,ObjectAccessNode):
+            node.obj_node = self.clone(node.obj_node,params)
+        elif isinstance(node,ListNode):
+            node.element_nodes = [self.clone(element_node,params) for element_node in node.element_nodes]
+        elif isinstance(node,IfNode):
+            node.cases = [(self.clone(condition,params),self.clone(expr,params),should_return_null)
+                for condition,expr,should_return_null in node.cases]
+            if node.else_case: node.else_case = (self.clone(node.else_case[0],params),node.else_case[1])
+        return node
+
+    def walk(self,node):
+        nodes = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            nodes.append(node)
+            stack.extend(child_nodes(node))
+        return nodes
+
+    def optimize_ReturnNode(self,node):
+        if node.node_to_return: node.node_to_return = self.get(node.node_to_return)
+        return node
+
+def compare(fn,text,engine):
+    # the outcome of running text with and without the optimizer, on a fresh scope each time
+    import solace, io, contextlib
+    outcomes = []
+    for optimize in (False,True):
+        # what the scripts log may depend on the clock, only results are compared
+        with contextlib.redirect_stdout(io.StringIO()):
+            try:
+                program,error = solace.compile(fn,text,optimize=optimize)
+                if not error: value,error = program.execute(engine=engine)
+                outcome = error.as_string() if error else repr(value)
+            except Exception as exception:
+                # python errors the language doesn't catch, both runs should still hit the same
+                outcome = f"{type(exception).__name__}: {exception}"
+        outcomes.append(outcome)
+    return outcomes
+
+if __name__ == "__main__":
+    # differential check, every script given, or every snippet in optimizer_cases.py when none are, must
+    # give the same result or error with and without the optimizer
+    import solace
+    if sys.argv[1:]:
+        sources = [(fn,solace.read_source(fn)) for fn in sys.argv[1:]]
+    else:
+        from optimizer_cases import CASES
+        sources = [("<case>",text) for text in CASES]
+    failed = 0
+    for fn,text in sources:
+        for engine in ("tree","vm"):
+            plain,optimized = compare(fn,text,engine)
+            if plain != optimized:
+                failed += 1
+                print(f"{fn} ({engine}): optimized run differs\n{text}\n--- plain\n{plain}\n--- optimized\n{optimized}")
+    print(f"{len(sources)} sources on both engines, {failed} differ")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,181 @@
+# snippets the optimizer must not change the behaviour of, run by 'python optimizer.py' with no scripts
+# arithmetic, control flow, scoping, objects and the errors each of them can raise
+CASES = [
+    "1+2*3-4/2; 2^3^2; -5+3; (1+2)*3; 7/2; 10-2-3",
+    "1<2; 2<=2; 3>4; 4>=5; 1==1; 1!=1; \"a\"==\"a\"; \"a\"!=\"b\"",
+    "1 and 0; 1 & 1; 0 or 0; 2 or 0; 0 | 3; not 1; !0; not 0 and 1; 0.5 or 0",
+    "let s = \"ab\" + \"cd\"; s*2; String.upper(s); String.tolist(\"xyz\"); len(s); String.find(s,\"c\")",
+    "let l = [1,2,3]; l + 4; l * [5,6]; l - 0; l / 1; len(l); List.add(l,9); l; List.get(l,0)",
+    "fun add(a,b) => a+b; add(2,3); let f = fun(x) { return x*2 }; f(4); fun g() { let z = 5 }; g()",
+    "fun g() => y; fun f() { let y = 5; return g() }; f()",
+    "fun fib(n) => if n < 2 => n else => fib(n-1)+fib(n-2); fib(12)",
+    "fun fact(n) { if n <= 1 { return 1 }; return n * fact(n-1) }; fact(10)",
+    "let x = 0; for i=0 to 10 { let x = x + i }; x; for i=0 to 5 => i*i; for i=10 to 0 step -3 => i",
+    "for i=0 to 10 => if i == 3 => stop else => i; for i=0 to 10 => if i == 2 => skip else => i",
+    "let r = []; for i=0 to 10 { if i == 5 { stop }; if i == 2 { skip }; let r = r + i }; r",
+    "let i = 0; while i < 5 { let i = i + 1 }; i; let j = 0; while j < 3 => let j = j + 1",
+    "if 1 => 10 elif 2 => 20 else => 30; if 0 => 1 elif 1 => 2 else => 3; if 0 { 1 } elif 0 { 2 } else { 3 }; if 1 { 5 }; if 0 => 1",
+    "let o = {a = 1\nb = fun(this) => this.a\nf = fun() => 7}; o.a; o.f(); let o.a = 5; o.a; o + {c=2}",
+    "let o = {x = 3\nmain = fun() { log(this.x) }}",
+    "let o = {v = 2\nget = fun() => this.v * 10}; o.get()",
+    "fun outer(a) { fun inner(b) => a + b; return inner(10) }; outer(5)",
+    "fun brk() { stop }; for i=0 to 10 => if i == 4 => brk() else => i",
+    "fun c() { skip }; for i=0 to 5 { if i == 2 { c() }; log(i) }",
+    "1; return 5; 2",
+    "log(\"hi\"); log(1+1); log([1,\"a\"]); log({a=1})",
+    "istype(1,\"int\"); istype(1.5,\"float\"); istype(\"a\",\"string\"); istype([],\"list\"); range(0,5,2); String.replace(\"aaa\",\"a\",\"b\",2); Math.sqrt(16); Math.floor(2.7); String.toint(\"42\")",
+    "1; foo + 1",
+    "1 + \"a\"",
+    "let a = 0; 5 / a",
+    "[1,2] / 5",
+    "fun f(a) => a; f(1,2)",
+    "fun f(a,b) => a; f(1)",
+    "fun f(x) { return x + \"s\" }; f(1)",
+    "String.upper(5)",
+    "error(\"Boom\",\"bad\")",
+    "log(1); exit(3); log(2)",
+    "let o = {a=1}; o.b",
+    "let o = {a=1}; let o.b = 2",
+    "let x = 1; x.a",
+    "1 + ",
+    "fun (",
+    "let = 5",
+    "1 + @",
+    "if 1 { 2",
+    "fun f(a) { return g(a) }; fun g(b) => b + []; f(1)",
+    "\nlet a = 1\n\nlet b = 2 # comment\n\na + b\n",
+    "\"a\\nb\\t\\\"c\"; \"x\\\\y\"",
+    "1.5 + 2; 3.25 * 2; 1.0 == 1",
+    "-(3); +4; --2; -(1+2)*3",
+    "let s = \"x\"; s == \"x\" and len(s) == 1",
+    "let l = [fun(a) => a*3]; (l / 0)(5)",
+    "((((((((((1+2))))))))))*((3))",
+    "for i=0 to 2 step 0.5 => i",
+    "let i = 0; while 1 { let i = i + 1; if i > 4 { stop } }; i",
+    "let mk = fun(v) => {val = v}; let o = mk(3); o.val",
+    "fun f() { return }; f(); fun g() { pass }",
+    "fun f() { let len = fun(x) => 99; return len([1]) }; f(); len([1,2])",
+    "len(1,2)",
+    "String.lower(5)",
+    "String.replace(\"aa\",\"a\",\"b\",1)",
+    "exit(\"bye\")",
+    "error(\"E\",\"d\")",
+    "Math.sqrt(0-1)",
+    "List.get([1],5)",
+    "Random.choice([])",
+    "fun f(a) => a; f()",
+    "fun f() { stop }; for i = 0 to 5 { f(); log(i) }",
+    "fun f() { skip }; for i = 0 to 3 { f(); log(i) }",
+    "return 5",
+    "stop",
+    "let o = {main = fun() { log(this) }}",
+    "let o = {a = 1; main = fun() => error(\"x\",\"y\")}",
+    "fun f() { for i = 0 to 9 { if i == 3 => return i } }; f()",
+    "fun f() => g(); fun g() => nope; f()",
+    "run(5)",
+    "run(\"nofile.sol\")",
+    "File.remove(\"nofile.txt\")",
+    "istype(1,\"int\")",
+    "range(0,3,1)",
+    "let x = 0; while true { let x = x + 1; if x > 4 => stop }; x",
+    "Float.toint(2.5)",
+    "String.toint(\"q\")",
+    "fun f(this) => 1; let o = {m = fun(this) => 1}",
+    "-\"a\"",
+    "List.add([1],2)",
+    "fun f() { return }; f()",
+    "let s = String; let s.lower = 1; [s.lower, String.lower]",
+    "String.lower(\"AB\")",
+    "fun h(o) { let o.lower = 5; return o.lower }; [h(String), String.lower]",
+    "String.lower(\"CD\")",
+    "let f = fun(a) => a; let o = {m = f}; [f, o.m]",
+    "let o = {m = fun() => this}; let g = o.m; g()",
+    "let o = {a=1; get = fun() => this.a}; o.get()",
+    "let o = {a=1; set = fun(v) { let this.a = v }}; o.set(4); o.a",
+    "let x = \"a\"; x + 1",
+    "let l = [1]; l / 5",
+    "let z = 0; 1 / z",
+    "let q = \"s\"; -q",
+    "let l = [1,2]; l - 7",
+    "len()",
+    "String.lower(1)",
+    "fun f(x) => x; let a = 5; f(a); a",
+    "let a = [1]; let b = a; let b = b + 2; [a, b]",
+    "let o = {x = 1}; let p = o; let p.x = 3; o.x",
+    "let o = {x = 1}; let p = o + {y = 2}; [o, p]",
+    "fun f() => 1 + \"x\"; fun g() => f(); g()",
+    "let o = {m = fun(a) => a * 2}; o.m(4)",
+    "Math.sqrt(16)",
+    "let n = null; let n = n + 1; [n, null]",
+    "let t = true; fun f(v) => v; f(t); fun g() => t + \"x\"; g()",
+    "let x = 5; fun f() { log(x); let x = 1; return x }; f(); x",
+    "fun g() => y; fun f() { let y = 7; return g() }; f()",
+    "fun f(n) { let acc = 0; for i = 0 to n { let acc = acc + i }; return [acc, i] }; f(5)",
+    "let o = {a = 1\n get = fun() => this.a\n set = fun(v) { let this.a = v }}; o.set(9); o.get()",
+    "fun outer() { fun inner(q) => q * k; let k = 3; return inner(2) }; outer()",
+    "fun f(a) { let a = a + 1; return a }; f(1)",
+    "fun f() { return this }; f()",
+    "let this = 4; fun f() => this; f()",
+    "fun f() { while i < 3 { let i = i + 1 }; return i }; let i = 0; f()",
+    "fun mk() { let c = 0; fun inc() { let c = c + 1; return c }; return [inc(), inc(), c] }; mk()",
+    "fun f(x) { let x.y = 1 }; f(1)",
+    "fun h() { let String.lower = 1; return String.lower }; [h(), String.lower]",
+    "fun f() { for i = 0 to 3 { if i == 1 { stop } }; return i }; f()",
+    "fun f() => g(); fun g() => 1; let a = f(); fun g() => 2; [a, f()]",
+    "fun f() => len([1]); let a = f(); fun w() { fun len(x) => 99; return f() }; [a, w(), f()]",
+    "fun d() { let q = 5; return r() }; fun r() => q; let q = 1; [r(), d(), r()]",
+    "fun f() => z; let z = 1; let a = f(); let z = 2; [a, f()]",
+    "let s = 0; for i = 0 to 4 { let v = i * 10; let s = s + v }; s",
+    "fun f() => log; let a = f(); let log = 3; [f(), a == log]",
+    "fun t() => true; let a = t(); fun u() { let true = 0; return t() }; [a, u(), t()]",
+    "60*60*24",
+    "let x = 2 + 3 * 4 - 1; x",
+    "\"ab\" + \"cd\"",
+    "\"ab\" * 3",
+    "1/0",
+    "let y = 1 / (2 - 2); y",
+    "2^3^2",
+    "2^100",
+    "2^1000",
+    "1 < 2",
+    "1 == 1.0",
+    "not 0",
+    "-5",
+    "- -5",
+    "-\"x\"",
+    "\"x\" - 1",
+    "(1+2) - \"a\"",
+    "[1,2] / (1+5)",
+    "let l=[1,2]; l / (3-1)",
+    "if 1 => 5 else => 6",
+    "if 0 => 5 elif 1 => 7 else => 6",
+    "if 0 => 5",
+    "if 0 { 5 }",
+    "if 1 { 5 } else { 6 }",
+    "if 0 => 1 elif 0 => 2",
+    "let a = 3; if a > 1 => 1 elif 1 => 2 elif a => 3 else => 4",
+    "let a = 0; if a > 1 => 1 elif 0 => 2 else => 4",
+    "fun f(n) { return n * 2; let z = 1/0 }; f(4)",
+    "fun f(n) { if n > 1 { return 1 }; return 2; 1/0 }; [f(0), f(5)]",
+    "for i = 0 to 5 { if i == 2 { skip; 1/0 }; i }",
+    "for i = 0 to 5 { if i == 3 { stop; 1/0 }; i * (2+3) }",
+    "let s = 0; while s < 5 { let s = s + 1; skip; let s = 100 }; s",
+    "fun f(n) => if 1 => n else => f(n); f(3)",
+    "fun t(n) => if 0 => 0 elif n == 0 => 1 else => t(n-1); t(500)",
+    "\"a\" == \"a\"",
+    "\"a\" and 1",
+    "1 and 0",
+    "0 or 3",
+    "\"x\" * 2.5",
+    "\"x\" * 10000",
+    "1.5 * 2",
+    "7 / 2",
+    "2 ^ -1",
+    "2 ^ 0.5",
+    "let o = {x = 2*3\n f = fun() => this.x * (1+1)}; o.f()",
+    "[1+1, \"a\"+\"b\", -(3), not 1]",
+    "fun g() { return }; g()",
+    "return 5; 6",
+    "stop; 5",
+    "let k = if 1 => 2; k",
+]
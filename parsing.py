@@ -2,13 +2,34 @@ from nodes import *
 from tokens import *
 from errors import *
 
+EXPR_START = frozenset((
+    TT_KW_LET,TT_NOT,TT_KW_NOT,TT_PLUS,TT_MINUS,
+    TT_INT,TT_FLOAT,TT_STRING,TT_IDENTIFIER,TT_LPAREN,TT_LSQUARE,TT_LBRACE,
+    TT_KW_IF,TT_KW_FOR,TT_KW_WHILE,TT_KW_FUN
+))
+STATEMENT_START = EXPR_START | {TT_KW_RETURN,TT_KW_SKIP,TT_KW_STOP}
+
+PREC_LOGIC = 1
+PREC_COMPARISON = 2
+PREC_ARITH = 3
+PREC_TERM = 4
+PREC_POWER = 5
+
+BINARY_PRECEDENCE = {
+    TT_AND:PREC_LOGIC,TT_OR:PREC_LOGIC,TT_KW_AND:PREC_LOGIC,TT_KW_OR:PREC_LOGIC,
+    TT_EE:PREC_COMPARISON,TT_NE:PREC_COMPARISON,TT_LT:PREC_COMPARISON,
+    TT_GT:PREC_COMPARISON,TT_LTE:PREC_COMPARISON,TT_GTE:PREC_COMPARISON,
+    TT_PLUS:PREC_ARITH,TT_MINUS:PREC_ARITH,
+    TT_MUL:PREC_TERM,TT_DIV:PREC_TERM,
+    TT_POW:PREC_POWER,
+}
+
 class ParseResult:
     def __init__(self):
         self.error = None
         self.node = None
         self.last_registered_advance_count = 0
         self.advance_count = 0
-        self.to_reverse_count = 0
         
     def register_advancement(self):
         self.last_registered_advance_count = 1
@@ -20,12 +41,6 @@ class ParseResult:
         if res.error: self.error = res.error
         return res.node
     
-    def try_register(self,res):
-        if res.error:
-            self.to_reverse_count = res.advance_count
-            return None
-        return self.register(res)
-
     def success(self, node):
         self.node = node
         return self
@@ -35,44 +50,64 @@ class ParseResult:
             self.error = error
         return self
 
+class TokenStream:
+    def __init__(self,tokens):
+        self.tokens = iter(tokens)
+        self.current = None
+        self.pulled = 0
+        
+    def kind(self,idx):
+        # the parser never looks back, so only the current token is kept
+        while idx >= self.pulled:
+            tok = next(self.tokens,None)
+            if tok == None: return None
+            self.current = tok
+            self.pulled += 1
+        return self.current.type
+
+    def token(self,idx):
+        return self.current
+
 class Parser:
     def __init__(self, tokens):
-        self.tokens: list[Token] = tokens
+        self.tokens = tokens if isinstance(tokens,TokenBuffer) else TokenStream(tokens)
         self.tok_idx = -1
         self.advance()
 
+    @property
+    def current_tok(self):
+        return self.tokens.token(self.current_idx)
+
     def advance(self):
         self.tok_idx += 1
         self.update_current_tok()
-        return self.current_tok
 
-    def reverse(self,amount):
-        self.tok_idx -= amount
-        self.update_current_tok()
-        return self.current_tok
-    
     def update_current_tok(self):
-        if self.tok_idx >= 0 and self.tok_idx < len(self.tokens):
-            self.current_tok = self.tokens[self.tok_idx]
+        if self.tok_idx >= 0:
+            kind = self.tokens.kind(self.tok_idx)
+            if kind != None:
+                self.current_kind = kind
+                self.current_idx = self.tok_idx
     
     def parse(self,isfromfile):
         if not isfromfile:
-            res = self.statements()
+            # the shell shows the value of every top level statement, so they stay a list
+            res = self.statements(ListNode)
         else:
             res = self.obj_expr()
-        if not res.error and self.current_tok.type != TT_EOF:
+        if not res.error and self.current_kind != TT_EOF:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '+', '-', '*' or '/'"
             ))
         return res
     
-    def statements(self):
+    def statements(self,node_class=BlockNode):
         res = ParseResult()
         statements = []
         pos_start = self.current_tok.pos_start.copy()
         
-        while self.current_tok.type == TT_NEWLINE:
+        while self.current_kind == TT_NEWLINE:
             res.register_advancement()
             self.advance()
             
@@ -80,27 +115,19 @@ class Parser:
         if res.error: return res
         statements.append(statement)
         
-        more_statements = True
-        
         while True:
             newline_count = 0
-            while self.current_tok.type == TT_NEWLINE:
+            while self.current_kind == TT_NEWLINE:
                 res.register_advancement()
                 self.advance()
                 newline_count += 1
-            if newline_count == 0:
-                more_statements = False
-                
-            if not more_statements: break
-            statement = res.try_register(self.statement())
-            if not statement:
-                self.reverse(res.to_reverse_count)
-                more_statements = False
-                continue
+            if newline_count == 0 or self.current_kind not in STATEMENT_START: break
             
+            statement = res.register(self.statement())
+            if res.error: return res
             statements.append(statement)
             
-        return res.success(ListNode(
+        return res.success(node_class(
             statements,pos_start,self.current_tok.pos_end.copy()
         ))
         
@@ -108,29 +135,25 @@ class Parser:
         res = ParseResult()
         pos_start = self.current_tok.pos_start.copy()
         
-        if self.current_tok.matches(TT_KEYWORD,"return"):
+        if self.current_kind == TT_KW_RETURN:
             res.register_advancement()
             self.advance()
-            expr = res.try_register(self.expr())
-            if not expr:
-                self.reverse(res.to_reverse_count)
+            expr = None
+            if self.current_kind in EXPR_START:
+                expr = res.register(self.expr())
+                if res.error: return res
             return res.success(ReturnNode(expr,pos_start,self.current_tok.pos_end.copy()))
         
-        if self.current_tok.matches(TT_KEYWORD,"skip"):
+        if self.current_kind == TT_KW_SKIP:
             res.register_advancement()
             self.advance()
             return res.success(ContinueNode(pos_start,self.current_tok.pos_end.copy()))
         
-        if self.current_tok.matches(TT_KEYWORD,"stop"):
+        if self.current_kind == TT_KW_STOP:
             res.register_advancement()
             self.advance()
             return res.success(BreakNode(pos_start,self.current_tok.pos_end.copy()))
 
-        if self.current_tok.matches(TT_KEYWORD,"pass"):
-            res.register_advancement()
-            self.advance()
-            return res.success(ReturnNode(None,pos_start,self.current_tok.pos_end.copy()))
-        
         expr = res.register(self.expr())
         if res.error:
             return res.failure(InvalidSyntaxError(
@@ -144,7 +167,7 @@ class Parser:
         cases = []
         else_case = None
         
-        if not self.current_tok.matches(TT_KEYWORD, case_keyword):
+        if self.current_kind != KEYWORDS[case_keyword]:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 f"Expected '{case_keyword}'"
@@ -156,7 +179,7 @@ class Parser:
         condition = res.register(self.expr())
         if res.error: return res
         
-        if self.current_tok.type == TT_ARROW:
+        if self.current_kind == TT_ARROW:
             res.register_advancement()
             self.advance()
             
@@ -169,7 +192,7 @@ class Parser:
             new_cases,else_case = all_cases
             cases.extend(new_cases)
         else:
-            if not self.current_tok.type == TT_LBRACE:
+            if not self.current_kind == TT_LBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '{' or '=>'"
@@ -181,7 +204,7 @@ class Parser:
             if res.error: return res
             cases.append((condition,statements,True))
             
-            if not self.current_tok.type == TT_RBRACE:
+            if not self.current_kind == TT_RBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -189,7 +212,7 @@ class Parser:
             res.register_advancement()
             self.advance()
             
-            if self.current_tok.matches(TT_KEYWORD,"elif") or self.current_tok.matches(TT_KEYWORD,"else"):
+            if self.current_kind == TT_KW_ELIF or self.current_kind == TT_KW_ELSE:
                 all_cases = res.register(self.if_expr_b_or_c())
                 if res.error: return res
                 new_cases,else_case = all_cases
@@ -204,18 +227,18 @@ class Parser:
         res = ParseResult()
         else_case = None
         
-        if self.current_tok.matches(TT_KEYWORD,"else"):
+        if self.current_kind == TT_KW_ELSE:
             res.register_advancement()
             self.advance()
             
-            if self.current_tok.type == TT_ARROW:
+            if self.current_kind == TT_ARROW:
                 res.register_advancement()
                 self.advance()
                 expr = res.register(self.statement())
                 if res.error: return res
                 else_case = (expr,False)
             else:
-                if not self.current_tok.type == TT_LBRACE:
+                if not self.current_kind == TT_LBRACE:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected '{' or '=>'"
@@ -227,7 +250,7 @@ class Parser:
                 if res.error: return res
                 else_case = (statements,True)
                 
-                if not self.current_tok.type == TT_RBRACE:
+                if not self.current_kind == TT_RBRACE:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected '}'"
@@ -241,7 +264,7 @@ class Parser:
         res = ParseResult()
         cases, else_case = [],None
         
-        if self.current_tok.matches(TT_KEYWORD,"elif"):
+        if self.current_kind == TT_KW_ELIF:
             all_cases = res.register(self.if_expr_b())
             if res.error: return res
             cases,else_case = all_cases
@@ -261,7 +284,7 @@ class Parser:
     def for_expr(self):
         res = ParseResult()
         
-        if not self.current_tok.matches(TT_KEYWORD, "for"):
+        if not self.current_kind == TT_KW_FOR:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected 'for'"
@@ -270,7 +293,7 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if not self.current_tok.type == TT_IDENTIFIER:
+        if not self.current_kind == TT_IDENTIFIER:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected identifier"
@@ -280,7 +303,7 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if not self.current_tok.type == TT_EQ:
+        if not self.current_kind == TT_EQ:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected '='"
@@ -292,7 +315,7 @@ class Parser:
         start_value = res.register(self.expr())
         if res.error: return res
         
-        if not self.current_tok.matches(TT_KEYWORD,"to") and not self.current_tok.type == TT_COLON:
+        if not self.current_kind == TT_KW_TO and not self.current_kind == TT_COLON:
             return res.failure(InvalidSyntaxError(
                 self.current_tok.pos_start, self.current_tok.pos_end,
                 "Expected 'to' or ':'"
@@ -304,7 +327,7 @@ class Parser:
         end_value = res.register(self.expr())
         if res.error: return res
         
-        if self.current_tok.matches(TT_KEYWORD,"step") and not self.current_tok.type == TT_COLON:
+        if self.current_kind == TT_KW_STEP and not self.current_kind == TT_COLON:
             res.register_advancement()
             self.advance()
             
@@ -313,7 +336,7 @@ class Parser:
         else:
             step_value = None
             
-        if self.current_tok.type == TT_ARROW:
+        if self.current_kind == TT_ARROW:
             res.register_advancement()
             self.advance()
             
@@ -323,7 +346,7 @@ class Parser:
             return res.success(ForNode(var_name,start_value,end_value,step_value,body,False))
             
         else:
-            if not self.current_tok.type == TT_LBRACE:
+            if not self.current_kind == TT_LBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '{' or '=>'"
@@ -334,7 +357,7 @@ class Parser:
             body = res.register(self.statements())
             if res.error: return res
             
-            if not self.current_tok.type == TT_RBRACE:
+            if not self.current_kind == TT_RBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -348,7 +371,7 @@ class Parser:
     def while_expr(self):
         res = ParseResult()
         
-        if not self.current_tok.matches(TT_KEYWORD,"while"):
+        if not self.current_kind == TT_KW_WHILE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected 'while'"
@@ -359,7 +382,7 @@ class Parser:
         condition = res.register(self.expr())
         if res.error: return res
         
-        if self.current_tok.type == TT_ARROW:  
+        if self.current_kind == TT_ARROW:  
             res.register_advancement()
             self.advance()
         
@@ -368,7 +391,7 @@ class Parser:
     
             return res.success(WhileNode(condition,body,False))
         else:
-            if not self.current_tok.type == TT_LBRACE:
+            if not self.current_kind == TT_LBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '{' or '=>'"
@@ -379,7 +402,7 @@ class Parser:
             body = res.register(self.statements())
             if res.error: return res
             
-            if not self.current_tok.type == TT_RBRACE:
+            if not self.current_kind == TT_RBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -392,7 +415,7 @@ class Parser:
     def func_def(self):
         res = ParseResult()
         
-        if not self.current_tok.matches(TT_KEYWORD,"fun"):
+        if not self.current_kind == TT_KW_FUN:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected 'fun'"
@@ -401,19 +424,19 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if self.current_tok.type == TT_IDENTIFIER:
+        if self.current_kind == TT_IDENTIFIER:
             var_name_tok = self.current_tok
             res.register_advancement()
             self.advance()
             
-            if not self.current_tok.type == TT_LPAREN:
+            if not self.current_kind == TT_LPAREN:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '('"
                 ))
         else:
             var_name_tok = None
-            if not self.current_tok.type == TT_LPAREN:
+            if not self.current_kind == TT_LPAREN:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected identifier or '('"
@@ -422,15 +445,15 @@ class Parser:
         res.register_advancement()
         self.advance()
         arg_name_toks = []
-        if self.current_tok.type == TT_IDENTIFIER:
+        if self.current_kind == TT_IDENTIFIER:
             arg_name_toks.append(self.current_tok)
             res.register_advancement()
             self.advance()
-            while self.current_tok.type == TT_COMMA:
+            while self.current_kind == TT_COMMA:
                 res.register_advancement()
                 self.advance()
                 
-                if not self.current_tok.type == TT_IDENTIFIER:
+                if not self.current_kind == TT_IDENTIFIER:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected identifier"
@@ -440,13 +463,13 @@ class Parser:
                 res.register_advancement()
                 self.advance()
         
-            if not self.current_tok.type == TT_RPAREN:
+            if not self.current_kind == TT_RPAREN:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected ',' or ')'"
                     ))
         else:
-            if not self.current_tok.type == TT_RPAREN:
+            if not self.current_kind == TT_RPAREN:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected identidier or ')'"
@@ -455,8 +478,8 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if not self.current_tok.type == TT_ARROW:
-            if not self.current_tok.type == TT_LBRACE:
+        if not self.current_kind == TT_ARROW:
+            if not self.current_kind == TT_LBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '{' or '=>'"
@@ -467,7 +490,7 @@ class Parser:
             body = res.register(self.statements())
             if res.error: return res
             
-            if not self.current_tok.type == TT_RBRACE:
+            if not self.current_kind == TT_RBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '}'"
@@ -493,10 +516,10 @@ class Parser:
         atom = res.register(self.atom())
         if res.error: return res
         
-        if self.current_tok.type == TT_DOT:
+        if self.current_kind == TT_DOT:
             res.register_advancement()
             self.advance()
-            if not self.current_tok.type == TT_IDENTIFIER:
+            if not self.current_kind == TT_IDENTIFIER:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected identifier"
@@ -505,12 +528,12 @@ class Parser:
             res.register_advancement()
             self.advance()
             atom = res.register(ParseResult().success(ObjectAccessNode(atom,var_name)))
-        if self.current_tok.type == TT_LPAREN:
+        if self.current_kind == TT_LPAREN:
             res.register_advancement()
             self.advance()
             arg_nodes = []
             
-            if self.current_tok.type == TT_RPAREN:
+            if self.current_kind == TT_RPAREN:
                 res.register_advancement()
                 self.advance()
             else:
@@ -520,14 +543,14 @@ class Parser:
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected ')', 'let' ,int, float, identifier, '+', '-', '(', '[' or 'not/!'"
                     ))
-                while self.current_tok.type == TT_COMMA:
+                while self.current_kind == TT_COMMA:
                     res.register_advancement()
                     self.advance()
                     
                     arg_nodes.append(res.register(self.expr()))
                     if res.error: return res
                 
-                if not self.current_tok.type == TT_RPAREN:
+                if not self.current_kind == TT_RPAREN:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected ',' or ')'"
@@ -544,7 +567,7 @@ class Parser:
         element_nodes = list()
         pos_start = self.current_tok.pos_start.copy()
         
-        if not self.current_tok.type == TT_LSQUARE:
+        if not self.current_kind == TT_LSQUARE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '['"
@@ -553,7 +576,7 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if self.current_tok.type == TT_RSQUARE:
+        if self.current_kind == TT_RSQUARE:
             res.register_advancement()
             self.advance()
         else:
@@ -563,14 +586,14 @@ class Parser:
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected ']', 'let' ,int, float, identifier, '+', '-', '(', '[' or 'not/!'"
                 ))
-            while self.current_tok.type == TT_COMMA:
+            while self.current_kind == TT_COMMA:
                 res.register_advancement()
                 self.advance()
                 
                 element_nodes.append(res.register(self.expr()))
                 if res.error: return res
             
-            if not self.current_tok.type == TT_RSQUARE:
+            if not self.current_kind == TT_RSQUARE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected ',' or ']'"
@@ -587,7 +610,7 @@ class Parser:
         vars = {}
         pos_start = self.current_tok.pos_start.copy()
         
-        if not self.current_tok.type == TT_LBRACE:
+        if not self.current_kind == TT_LBRACE:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start, self.current_tok.pos_end,
                     "Expected '{'"
@@ -596,18 +619,18 @@ class Parser:
         res.register_advancement()
         self.advance()
         
-        if self.current_tok.type == TT_RBRACE:
+        if self.current_kind == TT_RBRACE:
             res.register_advancement()
             self.advance()
         else:
-            while self.current_tok.type == TT_NEWLINE:
+            while self.current_kind == TT_NEWLINE:
                 res.register_advancement()
                 self.advance()
-            if self.current_tok.type == TT_RBRACE:
+            if self.current_kind == TT_RBRACE:
                 res.register_advancement()
                 self.advance()
             else:
-                if not self.current_tok.type == TT_IDENTIFIER:
+                if not self.current_kind == TT_IDENTIFIER:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected identifier"
@@ -615,7 +638,7 @@ class Parser:
                 var_name = self.current_tok
                 res.register_advancement()
                 self.advance()
-                if not self.current_tok.type == TT_EQ:
+                if not self.current_kind == TT_EQ:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected '='"
@@ -626,16 +649,16 @@ class Parser:
                 if res.error: return res
                 vars[var_name] = expr
                 
-                while self.current_tok.type == TT_NEWLINE:
+                while self.current_kind == TT_NEWLINE:
                     res.register_advancement()
                     self.advance()
-                    while self.current_tok.type == TT_NEWLINE:
+                    while self.current_kind == TT_NEWLINE:
                         res.register_advancement()
                         self.advance()
-                    if self.current_tok.type == TT_RBRACE:
+                    if self.current_kind == TT_RBRACE:
                         break
                     
-                    if not self.current_tok.type == TT_IDENTIFIER:
+                    if not self.current_kind == TT_IDENTIFIER:
                         return res.failure(InvalidSyntaxError(
                             self.current_tok.pos_start, self.current_tok.pos_end,
                             "Expected identifier"
@@ -643,7 +666,7 @@ class Parser:
                     var_name = self.current_tok
                     res.register_advancement()
                     self.advance()
-                    if not self.current_tok.type == TT_EQ:
+                    if not self.current_kind == TT_EQ:
                         return res.failure(InvalidSyntaxError(
                             self.current_tok.pos_start, self.current_tok.pos_end,
                             "Expected '='"
@@ -653,7 +676,7 @@ class Parser:
                     expr = res.register(self.expr())
                     if res.error: return res
                     vars[var_name] = expr
-                if not self.current_tok.type == TT_RBRACE:
+                if not self.current_kind == TT_RBRACE:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start, self.current_tok.pos_end,
                         "Expected '}'"
@@ -668,28 +691,29 @@ class Parser:
     def atom(self):
         res = ParseResult()
         tok = self.current_tok
+        kind = self.current_kind
 
-        if tok.type in (TT_INT, TT_FLOAT):
+        if kind in (TT_INT, TT_FLOAT):
             res.register_advancement()
             self.advance()
             return res.success(NumberNode(tok))
         
-        elif tok.type == TT_STRING:
+        elif kind == TT_STRING:
             res.register_advancement()
             self.advance()
             return res.success(StringNode(tok))
         
-        elif tok.type == TT_IDENTIFIER:
+        elif kind == TT_IDENTIFIER:
             res.register_advancement()
             self.advance()
             return res.success(VarAccessNode(tok))
 
-        elif tok.type == TT_LPAREN:
+        elif kind == TT_LPAREN:
             res.register_advancement()
             self.advance()
             expr = res.register(self.expr())
             if res.error: return res
-            if self.current_tok.type == TT_RPAREN:
+            if self.current_kind == TT_RPAREN:
                 res.register_advancement()
                 self.advance()
                 return res.success(expr)
@@ -699,32 +723,32 @@ class Parser:
                     "Expected ')'"
                 ))
                 
-        elif tok.type == TT_LSQUARE:
+        elif kind == TT_LSQUARE:
             list_expr = res.register(self.list_expr())
             if res.error: return res
             return res.success(list_expr)
         
-        elif tok.type == TT_LBRACE:
+        elif kind == TT_LBRACE:
             obj_expr = res.register(self.obj_expr())
             if res.error: return res
             return res.success(obj_expr)
                 
-        elif tok.matches(TT_KEYWORD, "if"):
+        elif kind == TT_KW_IF:
             if_expr = res.register(self.if_expr())
             if res.error: return res
             return res.success(if_expr)
         
-        elif tok.matches(TT_KEYWORD, "for"):
+        elif kind == TT_KW_FOR:
             for_expr = res.register(self.for_expr())
             if res.error: return res
             return res.success(for_expr)
         
-        elif tok.matches(TT_KEYWORD, "while"):
+        elif kind == TT_KW_WHILE:
             while_expr = res.register(self.while_expr())
             if res.error: return res
             return res.success(while_expr)
         
-        elif tok.matches(TT_KEYWORD, "fun"):
+        elif kind == TT_KW_FUN:
             func_def = res.register(self.func_def())
             if res.error: return res
             return res.success(func_def)
@@ -734,58 +758,48 @@ class Parser:
             "Expected int, float, identifier, '+', '-', '(', '[', '{', 'if', 'for', 'while', 'fun' or 'not/!'"
         ))
 
-    def power(self):
-        return self.bin_op(self.call, (TT_POW, ), self.factor)
-
-    def factor(self):
+    def binary_expr(self, min_prec):
         res = ParseResult()
-        tok = self.current_tok
+        kind = self.current_kind
 
-        if tok.type in (TT_PLUS, TT_MINUS):
+        if kind == TT_PLUS or kind == TT_MINUS or ((kind == TT_NOT or kind == TT_KW_NOT) and min_prec <= PREC_COMPARISON):
+            op_tok = self.current_tok
             res.register_advancement()
             self.advance()
-            factor = res.register(self.factor())
+            node = res.register(self.binary_expr(PREC_POWER if kind == TT_PLUS or kind == TT_MINUS else PREC_COMPARISON))
             if res.error: return res
-            return res.success(UnaryOpNode(tok, factor))
-
-        return self.power()
+            left = UnaryOpNode(op_tok, node)
+        else:
+            left = res.register(self.call())
+            if res.error:
+                if min_prec != PREC_COMPARISON: return res
+                return res.failure(InvalidSyntaxError(
+                    self.current_tok.pos_start, self.current_tok.pos_end,
+                    "Expected int, float, identifier, '+', '-', '(', '[' or 'not/!'"
+                ))
 
-    def term(self):
-        return self.bin_op(self.factor, (TT_MUL, TT_DIV))
-    
-    def arith_expr(self):
-        return self.bin_op(self.term,(TT_PLUS,TT_MINUS))
-    
-    def comp_expr(self):
-        res = ParseResult()
-        
-        if self.current_tok.type == TT_NOT or self.current_tok.matches(TT_KEYWORD,"not"):
+        while True:
+            kind = self.current_kind
+            prec = BINARY_PRECEDENCE.get(kind)
+            if prec == None or prec < min_prec: break
             op_tok = self.current_tok
             res.register_advancement()
             self.advance()
-            
-            node = res.register(self.comp_expr())
+            # '^' is right associative and its right side may start with a sign
+            right = res.register(self.binary_expr(prec if kind == TT_POW else prec+1))
             if res.error: return res
-            return res.success(UnaryOpNode(op_tok,node))
-        
-        node = res.register(self.bin_op(self.arith_expr,(TT_EE,TT_NE,TT_LT,TT_GT,TT_LTE,TT_GTE)))
-        
-        if res.error:
-            return res.failure(InvalidSyntaxError(
-            self.current_tok.pos_start, self.current_tok.pos_end,
-            "Expected int, float, identifier, '+', '-', '(', '[' or 'not/!'"
-        ))
-            
-        return res.success(node)
+            left = (LogicalOpNode if prec == PREC_LOGIC else BinOpNode)(left, op_tok, right)
+
+        return res.success(left)
 
     def expr(self):
         res = ParseResult()
         
-        if self.current_tok.matches(TT_KEYWORD,"let"):
+        if self.current_kind == TT_KW_LET:
             res.register_advancement()
             self.advance()
             
-            if self.current_tok.type != TT_IDENTIFIER:
+            if self.current_kind != TT_IDENTIFIER:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start,self.current_tok.pos_end,
                     "Expected identifier"
@@ -796,10 +810,10 @@ class Parser:
             res.register_advancement()
             self.advance()
             
-            if self.current_tok.type == TT_DOT:
+            if self.current_kind == TT_DOT:
                 res.register_advancement()
                 self.advance()
-                if self.current_tok.type != TT_IDENTIFIER:
+                if self.current_kind != TT_IDENTIFIER:
                     return res.failure(InvalidSyntaxError(
                         self.current_tok.pos_start,self.current_tok.pos_end,
                         "Expected identifier"
@@ -809,7 +823,7 @@ class Parser:
                 self.advance()
                 
             
-            if self.current_tok.type != TT_EQ:
+            if self.current_kind != TT_EQ:
                 return res.failure(InvalidSyntaxError(
                     self.current_tok.pos_start,self.current_tok.pos_end,
                     "Expected '='"
@@ -825,7 +839,7 @@ class Parser:
             else:
                 return res.success(ObjectAssignNode(var_name,second_var_name,expr))
         
-        node = res.register(self.double_bin_op(self.comp_expr, (TT_AND, TT_OR),((TT_KEYWORD,"and"),(TT_KEYWORD,"or"))))
+        node = res.register(self.binary_expr(PREC_LOGIC))
         
         if res.error:
             return res.failure(InvalidSyntaxError(
@@ -834,43 +848,3 @@ class Parser:
         ))
         
         return res.success(node)
-
-    def bin_op(self, func_a, ops, func_b=None):
-        if func_b == None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops or (self.current_tok.type,self.current_tok.value) in ops:
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
-
-        return res.success(left)
-    
-    def double_bin_op(self, func_a, ops1,ops2, func_b=None):
-        if func_b == None:
-            func_b = func_a
-
-        res = ParseResult()
-        left = res.register(func_a())
-        if res.error:
-            return res
-
-        while self.current_tok.type in ops1 or (self.current_tok.type,self.current_tok.value) in ops2:
-            op_tok = self.current_tok
-            res.register_advancement()
-            self.advance()
-            right = res.register(func_b())
-            if res.error:
-                return res
-            left = BinOpNode(left, op_tok, right)
-
-        return res.success(left)
@@ -1,3 +1,6 @@
+from bisect import bisect_right
+import re
+
 class Position:
     def __init__(self,idx,ln,col,fn,ftxt):
         self.idx = idx
@@ -15,4 +18,68 @@ class Position:
             self.col = 0
             
     def copy(self):
-        return Position(self.idx,self.ln,self.col,self.fn,self.ftxt)
\ No newline at end of file
+        return Position(self.idx,self.ln,self.col,self.fn,self.ftxt)
+
+class Source:
+    def __init__(self,fn,data):
+        self.fn = fn
+        self.data = data
+        self.line_starts = None
+        self.decoded = None
+
+    def __getstate__(self):
+        # cached trees only keep the file name, the text is read back if an error needs it
+        return {"fn":self.fn,"data":None,"line_starts":None,"decoded":None}
+
+    def load(self):
+        if self.data == None:
+            with open(self.fn,"r") as f:
+                self.data = f.read()
+        return self.data
+
+    @property
+    def text(self):
+        if isinstance(self.load(),str):
+            return self.data
+        if self.decoded == None:
+            self.decoded = self.data[:].decode()
+        return self.decoded
+
+    def line_col(self,idx):
+        if self.line_starts == None:
+            newline = "\n" if isinstance(self.load(),str) else b"\n"
+            self.line_starts = [0]+[match.end() for match in re.finditer(newline,self.data)]
+        ln = bisect_right(self.line_starts,idx)-1
+        return ln,idx-self.line_starts[ln]
+
+class OffsetPosition:
+    __slots__ = ("idx","source")
+
+    def __init__(self,idx,source):
+        self.idx = idx
+        self.source = source
+
+    @property
+    def ln(self):
+        return self.source.line_col(self.idx)[0]
+
+    @property
+    def col(self):
+        return self.source.line_col(self.idx)[1]
+
+    @property
+    def fn(self):
+        return self.source.fn
+
+    @property
+    def ftxt(self):
+        return self.source.text
+
+    def advance(self,current_char=None):
+        self.idx += 1
+
+    def copy(self):
+        return OffsetPosition(self.idx,self.source)
+
+    def __reduce__(self):
+        return OffsetPosition,(self.idx,self.source)
@@ -0,0 +1,113 @@
+from nodes import *
+
+def child_nodes(node):
+    if isinstance(node,ListNode): return node.element_nodes
+    if isinstance(node,BlockNode): return node.statement_nodes
+    if isinstance(node,ObjectNode): return list(node.vars.values())
+    if isinstance(node,BinOpNode): return [node.left_node,node.right_node]
+    if isinstance(node,UnaryOpNode): return [node.node]
+    if isinstance(node,ObjectAccessNode): return [node.obj_node]
+    if isinstance(node,(VarAssignNode,ObjectAssignNode)): return [node.value_node]
+    if isinstance(node,IfNode):
+        children = []
+        for condition,expr,_ in node.cases:
+            children.append(condition)
+            children.append(expr)
+        if node.else_case: children.append(node.else_case[0])
+        return children
+    if isinstance(node,ForNode):
+        children = [node.start_value_node,node.end_value_node,node.body_node]
+        if node.step_value_node: children.append(node.step_value_node)
+        return children
+    if isinstance(node,WhileNode): return [node.condition_node,node.body_node]
+    if isinstance(node,FuncDefNode): return [node.body_node]
+    if isinstance(node,CallNode): return [node.node_to_call]+node.arg_nodes
+    if isinstance(node,ReturnNode): return [node.node_to_return] if node.node_to_return else []
+    if isinstance(node,InlinedCallNode): return node.arg_nodes+[node.body_node]
+    return []
+
+class Resolver:
+    # scoping is dynamic, a function's free names belong to whoever called it, so only the names a
+    # function binds itself get slots in its frame and everything else is still looked up by name
+    def resolve(self,root):
+        stack = [(root,None,True)]
+        while stack:
+            node,layout,used = stack.pop()
+            if isinstance(node,FuncDefNode):
+                node.layout = self.function_layout(node)
+                self.mark_tail_calls(node)
+                stack.append((node.body_node,node.layout,node.should_auto_return))
+                continue
+            if layout != None and isinstance(node,(VarAccessNode,VarAssignNode,ForNode)):
+                node.slot = layout.get(node.var_name_tok.value)
+            if isinstance(node,ForNode):
+                node.observed = self.loop_variable_observed(node)
+            if isinstance(node,(ForNode,WhileNode)):
+                node.used = used
+            for child in child_nodes(node):
+                stack.append((child,layout,self.child_used(node,child,used)))
+        return root
+
+    def child_used(self,node,child,used):
+        # whether anything reads the value the child evaluates to, statements only matter if their block does
+        if isinstance(node,(ListNode,BlockNode)): return used
+        if isinstance(node,(ForNode,WhileNode)) and child is node.body_node:
+            return used and not node.should_return_null
+        if isinstance(node,IfNode):
+            for _,expr,should_return_null in node.cases:
+                if child is expr: return used and not should_return_null
+            if node.else_case and child is node.else_case[0]:
+                return used and not node.else_case[1]
+        return True
+
+    def function_layout(self,node):
+        layout = {}
+        for arg_name_tok in node.arg_name_toks:
+            layout.setdefault(arg_name_tok.value,len(layout))
+        stack = [node.body_node]
+        while stack:
+            node = stack.pop()
+            name = None
+            if isinstance(node,(VarAssignNode,ForNode)):
+                name = node.var_name_tok.value
+            elif isinstance(node,VarAccessNode) and node.var_name_tok.value == "this":
+                name = "this"
+            elif isinstance(node,ObjectAssignNode) and node.obj_name_tok.value == "this":
+                name = "this"
+            elif isinstance(node,FuncDefNode):
+                if node.var_name_tok: layout.setdefault(node.var_name_tok.value,len(layout))
+                continue
+            if name != None: layout.setdefault(name,len(layout))
+            stack.extend(child_nodes(node))
+        return layout
+
+    def loop_variable_observed(self,node):
+        # calls count as reading it, with dynamic scoping whatever they call can see the variable
+        name = node.var_name_tok.value
+        stack = [node.body_node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node,(CallNode,ObjectNode)): return True
+            if isinstance(node,(VarAccessNode,VarAssignNode,ForNode)) and node.var_name_tok.value == name: return True
+            if isinstance(node,ObjectAssignNode) and node.obj_name_tok.value == name: return True
+            stack.extend(child_nodes(node))
+        return False
+
+    def mark_tail_calls(self,node):
+        # a call whose value the function returns as is, the function runs it in place of nesting
+        tails = [node.body_node] if node.should_auto_return else []
+        stack = [node.body_node]
+        while stack:
+            node = stack.pop()
+            if isinstance(node,FuncDefNode): continue
+            if isinstance(node,ReturnNode) and node.node_to_return:
+                tails.append(node.node_to_return)
+            stack.extend(child_nodes(node))
+        while tails:
+            node = tails.pop()
+            if isinstance(node,CallNode):
+                node.tail = True
+            elif isinstance(node,IfNode):
+                for _,expr,should_return_null in node.cases:
+                    if not should_return_null: tails.append(expr)
+                if node.else_case and not node.else_case[1]: tails.append(node.else_case[0])
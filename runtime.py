@@ -42,4 +42,53 @@ class RTResult:
         return self
     
     def should_return(self):
-        return self.error or self.func_return_value or self.loop_should_break or self.loop_should_continue
\ No newline at end of file
+        return self.error or self.func_return_value or self.loop_should_break or self.loop_should_continue
+    
+    def unwrap(self):
+        if self.error: raise RuntimeFailure(self.error)
+        if self.func_return_value: raise FunctionReturn(self.func_return_value)
+        if self.loop_should_break: raise LoopBreak()
+        if self.loop_should_continue: raise LoopContinue()
+        return self.value
+
+# the tree interpreter returns values directly and unwinds errors, returns and loop jumps with these,
+# RTResult stays the protocol of the vm and of Value.execute
+class Signal(Exception):
+    pass
+
+class RuntimeFailure(Signal):
+    def __init__(self,error):
+        self.error = error
+
+    def as_result(self):
+        return RTResult().failure(self.error)
+
+class FunctionReturn(Signal):
+    def __init__(self,value):
+        self.value = value
+
+    def as_result(self):
+        return RTResult().success_return(self.value)
+
+class LoopBreak(Signal):
+    def as_result(self):
+        return RTResult().success_break()
+
+class LoopContinue(Signal):
+    def as_result(self):
+        return RTResult().success_continue()
+
+class TailCall:
+    # what a call in tail position evaluates to, the function being left makes the call itself
+    __slots__ = ("func","args","pos_start","pos_end")
+    def __init__(self,func,args,pos_start,pos_end):
+        self.func = func
+        self.args = args
+        self.pos_start = pos_start
+        self.pos_end = pos_end
+
+def capture(func,*args):
+    try:
+        return RTResult().success(func(*args))
+    except Signal as signal:
+        return signal.as_result()
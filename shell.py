@@ -1,6 +1,17 @@
-import solace
+import solace, sys
 from errors import ExitError
 
+solace.set_recursion_limit()
+
+if len(sys.argv) > 1:
+    try:
+        _,err = solace.run_file(sys.argv[1])
+    except OSError:
+        print(f"Failed to load script '{sys.argv[1]}'")
+        sys.exit(1)
+    if err: print(err.as_string())
+    sys.exit(1 if err else 0)
+
 while True:
     text = input("solace> ")
     if not text.strip(): continue
@@ -1,36 +1,209 @@
 from lexer import *
 from parsing import *
 from interpreter import *
+from compiler import Compiler
+from vm import VM
 from context import *
 from symboltable import *
-import values
-from args import BUILTIN_ARGS,BUILTIN_OBJS
-
-global_symbol_table = SymbolTable()
-global_symbol_table.set("null",Number.null)
-global_symbol_table.set("true",Number.true)
-global_symbol_table.set("false",Number.false)
-
-for name in BUILTIN_ARGS.keys():
-    if not "_" in name:
-        global_symbol_table.set(name,BuiltInFunction(name))
-for obj in BUILTIN_OBJS.keys():
-    global_symbol_table.set(obj,BuiltInObject(obj))
-
-def run(fn,text,isfromfile=False):
-    lexer = Lexer(fn,text)
-    tokens,error = lexer.make_tokens()
-    if error:return None,error
-    
-    parser = Parser(tokens)
-    ast = parser.parse(isfromfile)
+from environment import Environment
+from resolver import Resolver
+from optimizer import Optimizer
+import values, astcache, os, sys, time
+from collections import OrderedDict
+from multiprocessing import Process, Pipe
+from multiprocessing.connection import wait
+
+environment = Environment()
+global_symbol_table = environment.scope()
+
+ENGINE = "tree"
+LEXER = RegexLexer
+TOKEN_BUFFER = False
+OPTIMIZE = False
+
+def set_recursion_limit(limit=None):
+    # python has to fit the deepest solace call chain, its own limit is only ever raised to match
+    if limit != None: values.RECURSION_LIMIT = limit
+    sys.setrecursionlimit(max(sys.getrecursionlimit(),values.RECURSION_LIMIT*values.FRAMES_PER_CALL))
+
+def parse(fn,text,isfromfile=False,token_buffer=None,optimize=None):
+    lexer = LEXER(fn,text)
+    if TOKEN_BUFFER if token_buffer == None else token_buffer:
+        tokens,error = lexer.make_token_buffer()
+        if error: return None,error
+        ast = Parser(tokens).parse(isfromfile)
+    else:
+        tokens = lexer.iter_tokens()
+        ast = Parser(tokens).parse(isfromfile)
+        if ast.error:
+            # lexing errors take precedence, so finish lexing what the parser did not reach
+            for _ in tokens: pass
+        if lexer.error: return None,lexer.error
     if ast.error: return None,ast.error
-    
-    interpreter = Interpreter()
-    context = Context("<program>")
-    context.symbol_table = global_symbol_table
-    result = interpreter.visit(ast.node,context)
-    
-    return result.value,result.error
-
-values.main_run = run
\ No newline at end of file
+    node = ast.node
+    if OPTIMIZE if optimize == None else optimize:
+        node = Optimizer().optimize(node)
+    return Resolver().resolve(node),None
+
+def parse_file(fn,isfromfile=True,optimize=None):
+    optimize = OPTIMIZE if optimize == None else optimize
+    node = astcache.load(fn,isfromfile,optimize)
+    if node != None: return node,None
+    stat = os.stat(fn)
+    text = read_source(fn)
+    node,error = parse(fn,text,isfromfile,optimize=optimize)
+    if not error: astcache.store(fn,text,isfromfile,node,stat,optimize)
+    return node,error
+
+def to_value(value):
+    if isinstance(value,Value): return value
+    if isinstance(value,bool): return Number(int(value))
+    if isinstance(value,(int,float)): return Number(value)
+    if isinstance(value,str): return String(value)
+    if isinstance(value,(list,tuple)): return List([to_value(element) for element in value])
+    if isinstance(value,dict): return Object({name:to_value(element) for name,element in value.items()})
+    raise TypeError(f"Cannot convert '{type(value).__name__}' to a Solace value")
+
+class Program:
+    def __init__(self,fn,node):
+        self.fn = fn
+        self.node = node
+        self.code = None
+
+    def __repr__(self) -> str:
+        return f"<program {self.fn}>"
+
+    def execute(self,inputs=None,engine=None,symbol_table=None):
+        # every run gets its own scope over the builtins unless a table is given, so runs never see each other
+        if symbol_table == None:
+            symbol_table = environment.scope()
+        if inputs:
+            for name,value in inputs.items():
+                symbol_table.set(name,to_value(value))
+        context = Context("<program>")
+        context.symbol_table = symbol_table
+        context.global_table = symbol_table
+        if (engine or ENGINE) == "vm":
+            if self.code == None:
+                self.code = Compiler().compile_program(self.node)
+            result = VM().run(self.code,context)
+        else:
+            interpreter = Interpreter()
+            result = capture(interpreter.visit,self.node,context)
+        
+        return result.value,result.error
+
+PROGRAM_CACHE_SIZE = 128
+program_cache = OrderedDict()
+
+def compile(fn,text,isfromfile=False,optimize=None):
+    optimize = OPTIMIZE if optimize == None else optimize
+    key = (astcache.source_hash(text),fn,isfromfile,optimize)
+    program = program_cache.get(key)
+    if program != None:
+        program_cache.move_to_end(key)
+        return program,None
+    node,error = parse(fn,text,isfromfile,optimize=optimize)
+    if error: return None,error
+    program = Program(fn,node)
+    program_cache[key] = program
+    if len(program_cache) > PROGRAM_CACHE_SIZE:
+        program_cache.popitem(last=False)
+    return program,None
+
+def interpret(node,engine=None,symbol_table=None):
+    return Program(None,node).execute(engine=engine,symbol_table=symbol_table or global_symbol_table)
+
+def run(fn,text,isfromfile=False,engine=None,token_buffer=None,optimize=None):
+    node,error = parse(fn,text,isfromfile,token_buffer,optimize)
+    if error: return None,error
+    return interpret(node,engine)
+
+def run_file(fn,isfromfile=True,engine=None,optimize=None):
+    node,error = parse_file(fn,isfromfile,optimize)
+    if error: return None,error
+    return interpret(node,engine)
+
+def to_python(value):
+    if isinstance(value,(Number,String)): return value.value
+    if isinstance(value,List): return [to_python(element) for element in value.elements]
+    if isinstance(value,Object): return {name:to_python(element) for name,element in value.vars.items()}
+    return repr(value)
+
+def run_job(fn,text,inputs,engine):
+    try:
+        program,error = compile(fn,text)
+        if error: return None,error.as_string()
+        value,error = program.execute(inputs,engine)
+        if error: return None,error.as_string()
+        return to_python(value),None
+    except Exception as e:
+        return None,f"Internal Error: {type(e).__name__}: {e}"
+
+def run_worker(conn,engine):
+    # builtins and the program cache stay warm for every job this process gets
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job == None: break
+        index,fn,text,inputs = job
+        conn.send((index,)+run_job(fn,text,inputs,engine))
+
+def start_worker(engine):
+    conn,child_conn = Pipe()
+    process = Process(target=run_worker,args=(child_conn,engine),daemon=True)
+    process.start()
+    child_conn.close()
+    return process,conn
+
+def run_many(jobs,workers=None,timeout=None,engine=None):
+    jobs = iter(enumerate(jobs))
+    idle = [start_worker(engine) for _ in range(workers or os.cpu_count() or 1)]
+    busy = {}
+    try:
+        while True:
+            while idle:
+                index,job = next(jobs,(None,None))
+                if job == None: break
+                fn,text = job[0],job[1]
+                inputs = job[2] if len(job) > 2 else None
+                job_timeout = job[3] if len(job) > 3 else timeout
+                process,conn = idle.pop()
+                conn.send((index,fn,text,inputs))
+                busy[conn] = (process,index,None if job_timeout == None else time.monotonic()+job_timeout,job_timeout)
+            if not busy: break
+
+            deadlines = [deadline for _,_,deadline,_ in busy.values() if deadline != None]
+            for conn in wait(list(busy.keys()),max(0,min(deadlines)-time.monotonic()) if deadlines else None):
+                process,index,_,_ = busy.pop(conn)
+                try:
+                    _,value,error = conn.recv()
+                    idle.append((process,conn))
+                except EOFError:
+                    value,error = None,f"Internal Error: worker exited with code {process.exitcode}"
+                    idle.append(start_worker(engine))
+                yield index,value,error
+
+            now = time.monotonic()
+            for conn,(process,index,deadline,job_timeout) in list(busy.items()):
+                if deadline != None and now >= deadline:
+                    # a worker stuck in a job can only be stopped by replacing it
+                    del busy[conn]
+                    process.kill()
+                    process.join()
+                    idle.append(start_worker(engine))
+                    yield index,None,f"Timeout Error: job took longer than {job_timeout} seconds"
+    finally:
+        for process,conn in idle+[(process,conn) for conn,(process,_,_,_) in busy.items()]:
+            try:
+                conn.send(None)
+            except OSError:
+                pass
+            process.join(1)
+            if process.is_alive(): process.kill()
+
+values.main_run = run
+values.main_parse_file = parse_file
+values.main_interpret = interpret
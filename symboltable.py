@@ -1,16 +1,103 @@
+# every name ever bound below the global scope, with dynamic scoping the caller chain decides what
+# these resolve to so lookups of them are never cached
+local_names = set()
+
 class SymbolTable:
+    # bumped whenever a global binding changes or a name first gets bound locally, inline caches
+    # of global and builtin lookups are only valid while it stays the same
+    version = 0
+
     def __init__(self,parent=None):
         self.symbols = {}
         self.parent = parent
+        self.shared = False
         
     def get(self,name):
-        value = self.symbols.get(name,None)
-        if value == None and self.parent:
-            return self.parent.get(name)
+        # every active call adds a table to the chain, so it is walked rather than recursed
+        table = self
+        while table != None:
+            value = table.get_local(name)
+            if value != None: return value
+            table = table.parent
+        return None
+    
+    def get_private(self,name):
+        # values are shared between bindings, so before anyone mutates one it is copied and the copy bound
+        # where the name was found, or in the outermost private scope if it came from a shared layer
+        table = self
+        private = None
+        while table != None and not table.shared:
+            value = table.get_local(name)
+            if value != None:
+                value = value.copy()
+                table.set(name,value)
+                return value
+            private = table
+            table = table.parent
+        if table == None or private == None: return None
+        value = table.get(name)
+        if value == None: return None
+        value = value.copy()
+        private.set(name,value)
         return value
     
+    def get_local(self,name):
+        return self.symbols.get(name,None)
+    
     def set(self,name,value):
         self.symbols[name] = value
+        if not name in local_names: bind_local(name)
         
     def remove(self,name):
-        del self.symbols[name]
\ No newline at end of file
+        del self.symbols[name]
+
+class GlobalSymbolTable(SymbolTable):
+    def __init__(self,parent=None):
+        super().__init__(parent)
+        SymbolTable.version += 1
+
+    def set(self,name,value):
+        self.symbols[name] = value
+        SymbolTable.version += 1
+
+    def remove(self,name):
+        del self.symbols[name]
+        SymbolTable.version += 1
+
+def bind_local(*names):
+    local_names.update(names)
+    SymbolTable.version += 1
+
+class SlotSymbolTable(SymbolTable):
+    # a function frame, names the resolver found in the body live in a fixed list and anything else
+    # (like the 'this' of methods) in a dict that is only created when needed
+    def __init__(self,layout,parent=None):
+        self.layout = layout
+        self.slots = [None]*len(layout)
+        self.symbols = None
+        self.parent = parent
+        self.shared = False
+
+    def get_local(self,name):
+        slot = self.layout.get(name)
+        if slot != None: return self.slots[slot]
+        if self.symbols == None: return None
+        return self.symbols.get(name,None)
+
+    def set(self,name,value):
+        slot = self.layout.get(name)
+        if slot != None:
+            self.slots[slot] = value
+        else:
+            if self.symbols == None: self.symbols = {}
+            self.symbols[name] = value
+            if not name in local_names: bind_local(name)
+
+    def remove(self,name):
+        slot = self.layout.get(name)
+        if slot != None:
+            if self.slots[slot] == None: raise KeyError(name)
+            self.slots[slot] = None
+        else:
+            if self.symbols == None: raise KeyError(name)
+            del self.symbols[name]
@@ -0,0 +1,29 @@
+import pytest
+import solace
+from lexer import Lexer,RegexLexer
+from optimizer_cases import CASES
+
+PROGRAMS = [
+    "fun fib(n) => if n < 2 => n else => fib(n-1) + fib(n-2); fib(15)",
+    "let o = {x = 2\n f = fun() => this.x * 3}; o.f()",
+    "for i = 0 to 8 { if i == 3 { skip }; if i == 6 { stop }; i }",
+    "let l = for i = 0 to 8 => if i == 3 => skip else => i; l",
+    "let s = \"a\\\"b\\n\"; [s, s + \"c\", 1.5 != 2, 3 >= 3, 2 <= 1]",
+    "let o = {a = 1\n b = 2}; let o.a = o.a + 5; o  # comment",
+    "1 +",
+    "let x = $",
+] + CASES
+
+def outcome(lexer,text,engine):
+    solace.LEXER = lexer
+    try:
+        node,error = solace.parse("<test>",text)
+        if not error: value,error = solace.Program("<test>",node).execute(engine=engine)
+    finally:
+        solace.LEXER = RegexLexer
+    return error.as_string() if error else repr(value)
+
+@pytest.mark.parametrize("engine",["tree","vm"])
+@pytest.mark.parametrize("text",PROGRAMS)
+def test_lexers_agree(text,engine,capsys):
+    assert outcome(Lexer,text,engine) == outcome(RegexLexer,text,engine)
@@ -0,0 +1,9 @@
+import pytest
+from optimizer import compare
+from optimizer_cases import CASES
+
+@pytest.mark.parametrize("engine",["tree","vm"])
+@pytest.mark.parametrize("text",CASES)
+def test_optimized_run_matches(text,engine):
+    plain,optimized = compare("<case>",text,engine)
+    assert optimized == plain
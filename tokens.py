@@ -1,53 +1,73 @@
-TT_INT = "INT"
-TT_FLOAT = "FLOAT"
-TT_IDENTIFIER  = "IDENTIFIER"
-TT_KEYWORD = "KEYWORD"
-TT_PLUS = "PLUS"
-TT_MINUS = "MINUS"
-TT_MUL = "MUL"
-TT_DIV = "DIV"
-TT_POW = "POW"
-TT_EQ = "EQ"
-TT_LPAREN = "LPAREN"
-TT_RPAREN = "RPAREN"
-TT_EE = "EE"
-TT_NE = "NE"
-TT_LT = "LT"
-TT_GT = "GT"
-TT_LTE = "LTE"
-TT_GTE = "GTE"
-TT_EOF = "EOF"
-TT_AND = "AND"
-TT_OR = "OR"
-TT_NOT = "NOT"
-TT_LBRACE = "LBRACE"
-TT_RBRACE = "RBRACE"
-TT_COLON = "COLON"
-TT_COMMA = "COMMA"
-TT_STRING = "STRING"
-TT_LSQUARE = "LSQUARE"
-TT_RSQUARE = "RSQUARE"
-TT_ARROW = "ARROW"
-TT_NEWLINE = "NEWLINE"
-TT_DOT = "DOT"
-
-KEYWORDS = [
-    "let",
-    "if",
-    "elif",
-    "else",
-    "for",
-    "to",
-    "step",
-    "while",
-    "and",
-    "or",
-    "not",
-    "fun",
-    "return",
-    "skip",
-    "stop"
-]
+from position import OffsetPosition
+from array import array
+
+TT_INT = 0
+TT_FLOAT = 1
+TT_IDENTIFIER = 2
+TT_PLUS = 3
+TT_MINUS = 4
+TT_MUL = 5
+TT_DIV = 6
+TT_POW = 7
+TT_EQ = 8
+TT_LPAREN = 9
+TT_RPAREN = 10
+TT_EE = 11
+TT_NE = 12
+TT_LT = 13
+TT_GT = 14
+TT_LTE = 15
+TT_GTE = 16
+TT_EOF = 17
+TT_AND = 18
+TT_OR = 19
+TT_NOT = 20
+TT_LBRACE = 21
+TT_RBRACE = 22
+TT_COLON = 23
+TT_COMMA = 24
+TT_STRING = 25
+TT_LSQUARE = 26
+TT_RSQUARE = 27
+TT_ARROW = 28
+TT_NEWLINE = 29
+TT_DOT = 30
+
+TT_KW_LET = 31
+TT_KW_IF = 32
+TT_KW_ELIF = 33
+TT_KW_ELSE = 34
+TT_KW_FOR = 35
+TT_KW_TO = 36
+TT_KW_STEP = 37
+TT_KW_WHILE = 38
+TT_KW_AND = 39
+TT_KW_OR = 40
+TT_KW_NOT = 41
+TT_KW_FUN = 42
+TT_KW_RETURN = 43
+TT_KW_SKIP = 44
+TT_KW_STOP = 45
+
+TT_NAMES = {value:name[3:] for name,value in globals().items() if name.startswith("TT_")}
+
+KEYWORDS = {
+    "let":TT_KW_LET,
+    "if":TT_KW_IF,
+    "elif":TT_KW_ELIF,
+    "else":TT_KW_ELSE,
+    "for":TT_KW_FOR,
+    "to":TT_KW_TO,
+    "step":TT_KW_STEP,
+    "while":TT_KW_WHILE,
+    "and":TT_KW_AND,
+    "or":TT_KW_OR,
+    "not":TT_KW_NOT,
+    "fun":TT_KW_FUN,
+    "return":TT_KW_RETURN,
+    "skip":TT_KW_SKIP,
+    "stop":TT_KW_STOP,
+}
 
 class Token:
     def __init__(self,type_,value=None,pos_start=None,pos_end=None):
@@ -66,5 +86,69 @@ class Token:
         return self.type == type_ and self.value == value
         
     def __repr__(self) -> str:
-        if self.value: return f"{self.type}:{self.value}"
-        return f"{self.type}"
\ No newline at end of file
+        if self.value: return f"{TT_NAMES[self.type]}:{self.value}"
+        return f"{TT_NAMES[self.type]}"
+
+class OffsetToken:
+    __slots__ = ("type","value","start","end","source")
+
+    def __init__(self,type_,value,start,end,source):
+        self.type = type_
+        self.value = value
+        self.start = start
+        self.end = end
+        self.source = source
+
+    @property
+    def pos_start(self):
+        return OffsetPosition(self.start,self.source)
+
+    @property
+    def pos_end(self):
+        return OffsetPosition(self.end,self.source)
+
+    def __reduce__(self):
+        return OffsetToken,(self.type,self.value,self.start,self.end,self.source)
+
+    matches = Token.matches
+    __repr__ = Token.__repr__
+
+class TokenBuffer:
+    def __init__(self,source):
+        self.source = source
+        self.kinds = array("B")
+        self.value_ids = array("I")
+        self.starts = array("I")
+        self.ends = array("I")
+        self.values = [None]
+        self.value_lookup = {}
+        self.cached_idx = -1
+        self.cached_tok = None
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def append(self,kind,value,start,end):
+        value_id = 0
+        if value != None:
+            # keyed by kind as well so that 1 and 1.0 keep their own entries
+            value_id = self.value_lookup.setdefault((kind,value),len(self.values))
+            if value_id == len(self.values): self.values.append(value)
+        self.kinds.append(kind)
+        self.value_ids.append(value_id)
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def finish(self):
+        self.value_lookup = None
+        return self
+
+    def kind(self,idx):
+        if idx < len(self.kinds): return self.kinds[idx]
+        return None
+
+    def token(self,idx):
+        if idx != self.cached_idx:
+            self.cached_tok = OffsetToken(self.kinds[idx],self.values[self.value_ids[idx]],self.starts[idx],self.ends[idx],self.source)
+            self.cached_idx = idx
+        return self.cached_tok
@@ -1,27 +1,27 @@
 from errors import *
-from runtime import RTResult
+from tokens import *
+from runtime import RuntimeFailure,FunctionReturn,TailCall,capture
 from context import Context
-from symboltable import SymbolTable
-import os, time, math, random
+from symboltable import SymbolTable,SlotSymbolTable
+import os, time, math, random, threading
+from types import MappingProxyType
 from args import BUILTIN_ARGS,BUILTIN_OBJS,REAL_BUILTIN_ARGS
 
 interpreter = None
 main_run = None
+main_parse_file = None
+main_interpret = None
 
 class Value:
+    # plain values are immutable and carry no position or context, those belong to the node or
+    # instruction using them, only functions keep a call site of their own
+    __slots__ = ()
     typename = "any"
-    def __init__(self):
-        self.set_pos()
-        self.set_context()
-        self.parent_obj = None
-        
-    def set_obj(self,obj):
-        self.parent_obj = obj
-        return self
+    pos_start = None
+    pos_end = None
+    context = None
 
     def set_pos(self, ps=None, pe=None):
-        self.pos_start = ps
-        self.pos_end = pe
         return self
 
     def added_to(self, other):
@@ -67,135 +67,114 @@ class Value:
         return None, self.illegal_operation()
         
     def set_context(self,context=None):
-        self.context = context
         return self
     
     def copy(self):
-        raise Exception("No copy method defined")
+        return self
     
     def is_true(self):
         return False
     
     def illegal_operation(self,other=None):
-        if not other: other = self
-        return RTError(
-            self.pos_start,other.pos_end,
-            "Illegal operation",self.context
-        )
+        return OperationError("Illegal operation")
         
     def execute(self):
         pass
 
 class Number(Value):
+    __slots__ = ("value",)
     typename = "number"
     def __init__(self, value):
-        super().__init__()
         self.value = value
 
-    def set_pos(self, ps=None, pe=None):
-        self.pos_start = ps
-        self.pos_end = pe
-        return self
-
     def added_to(self, other):
         if isinstance(other, Number):
-            return Number(self.value+other.value).set_context(self.context), None
+            return make_number(self.value+other.value), None
         else:
             return None,self.illegal_operation(other)
 
     def subbed_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value-other.value).set_context(self.context), None
+            return make_number(self.value-other.value), None
         else:
             return None,self.illegal_operation(other)
 
     def multed_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value*other.value).set_context(self.context), None
+            return make_number(self.value*other.value), None
         else:
             return None,self.illegal_operation(other)
 
     def powed_by(self, other):
         if isinstance(other, Number):
-            return Number(self.value**other.value).set_context(self.context), None
+            return make_number(self.value**other.value), None
         else:
             return None,self.illegal_operation(other)
 
     def dived_by(self, other):
         if isinstance(other, Number):
             if other.value == 0:
-                return None, RTError(
-                    other.pos_start, other.pos_end,
-                    "Division by zero",
-                    self.context
-                )
-            return Number(self.value/other.value).set_context(self.context), None
+                return None, OperationError("Division by zero",True)
+            return make_number(self.value/other.value), None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_eq(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value == other.value)).set_context(self.context), None
+            return Number.true if self.value == other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_ne(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value != other.value)).set_context(self.context), None
+            return Number.true if self.value != other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_lt(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value < other.value)).set_context(self.context), None
+            return Number.true if self.value < other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_gt(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value > other.value)).set_context(self.context), None
+            return Number.true if self.value > other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_lte(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value <= other.value)).set_context(self.context), None
+            return Number.true if self.value <= other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def get_comparison_gte(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value >= other.value)).set_context(self.context), None
+            return Number.true if self.value >= other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
 
     def anded_by(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value and other.value)).set_context(self.context), None
+            return make_number(int(self.value and other.value)), None
         else:
             return None,self.illegal_operation(other)
 
     def ored_by(self, other):
         if isinstance(other, Number):
-            return Number(int(self.value or other.value)).set_context(self.context), None
+            return make_number(int(self.value or other.value)), None
         else:
             return None,self.illegal_operation(other)
 
     def notted(self):
-        return Number(1 if self.value == 0 else 0).set_context(self.context), None
-        
-    def set_context(self,context=None):
-        self.context = context
-        return self
-    
-    def copy(self):
-        copy = Number(self.value)
-        copy.set_pos(self.pos_start,self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        return Number.true if self.value == 0 else Number.false, None
     
     def is_true(self):
         return self.value != 0
+    
+    def __reduce__(self):
+        return (constant,(self.value,))
         
     def __repr__(self) -> str:
         return str(self.value)
@@ -204,44 +183,100 @@ Number.null = Number(0)
 Number.false = Number(0)
 Number.true = Number(1)
 
+SMALL_INT_MIN = -5
+SMALL_INT_MAX = 256
+small_ints = [Number(i) for i in range(SMALL_INT_MIN,SMALL_INT_MAX+1)]
+
+def make_number(value):
+    # results that land in the small int range reuse the pooled instance
+    if type(value) == int and SMALL_INT_MIN <= value <= SMALL_INT_MAX:
+        return small_ints[value-SMALL_INT_MIN]
+    return Number(value)
+
+# stand-ins for binary operations on one pair of operand types, with no dispatch and no error tuple,
+# they return None for any other types and the site using them goes back to the generic method
+def numbers_added(left,right):
+    if type(left) == Number and type(right) == Number: return make_number(left.value+right.value)
+
+def numbers_subbed(left,right):
+    if type(left) == Number and type(right) == Number: return make_number(left.value-right.value)
+
+def numbers_multed(left,right):
+    if type(left) == Number and type(right) == Number: return make_number(left.value*right.value)
+
+def numbers_dived(left,right):
+    if type(left) == Number and type(right) == Number and right.value != 0: return Number(left.value/right.value)
+
+def numbers_eq(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value == right.value else Number.false
+
+def numbers_ne(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value != right.value else Number.false
+
+def numbers_lt(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value < right.value else Number.false
+
+def numbers_gt(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value > right.value else Number.false
+
+def numbers_lte(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value <= right.value else Number.false
+
+def numbers_gte(left,right):
+    if type(left) == Number and type(right) == Number: return Number.true if left.value >= right.value else Number.false
+
+def strings_added(left,right):
+    if type(left) == String and type(right) == String: return String(left.value+right.value)
+
+def strings_eq(left,right):
+    if type(left) == String and type(right) == String: return Number.true if left.value == right.value else Number.false
+
+def strings_ne(left,right):
+    if type(left) == String and type(right) == String: return Number.true if left.value != right.value else Number.false
+
+def quickened(method,left,right):
+    return QUICK_OPS.get((method,type(left),type(right)))
+
+def short_circuit(method,left):
+    # what 'and'/'or' give without the right operand, None when it still decides the result
+    if isinstance(left,Number) and (not left.value if method == "anded_by" else left.value):
+        return make_number(int(left.value))
+
 class String(Value):
+    __slots__ = ("value",)
     typename = "string"
     def __init__(self,value):
-        super().__init__()
         self.value = value
         
     def get_comparison_eq(self, other):
         if isinstance(other, String):
-            return Number(int(self.value == other.value)).set_context(self.context), None
+            return Number.true if self.value == other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
         
     def get_comparison_ne(self, other):
         if isinstance(other, String):
-            return Number(int(self.value != other.value)).set_context(self.context), None
+            return Number.true if self.value != other.value else Number.false, None
         else:
             return None,self.illegal_operation(other)
         
     def added_to(self, other):
         if isinstance(other,String):
-            return String(self.value+other.value).set_context(self.context),None
+            return String(self.value+other.value),None
         else:
             return None,self.illegal_operation(other)
         
     def multed_by(self, other):
         if isinstance(other,Number):
-            return String(self.value*other.value).set_context(self.context),None
+            return String(self.value*other.value),None
         else:
             return None,self.illegal_operation(other)
         
     def is_true(self):
         return len(self.value) > 0
     
-    def copy(self):
-        copy = String(self.value)
-        copy.set_context(self.context)
-        copy.set_pos(self.pos_start,self.pos_end)
-        return copy
+    def __reduce__(self):
+        return (constant,(self.value,))
     
     def __repr__(self) -> str:
         return f'"{self.value}"'
@@ -249,13 +284,62 @@ class String(Value):
     def __str__(self):
         return self.value
 
+chars = {}
+
+def make_char(value):
+    char = chars.get(value)
+    if char == None:
+        char = chars[value] = String(value)
+    return char
+
+def constant(value):
+    # literals are built once when parsed and shared by every evaluation of their node
+    if isinstance(value,str):
+        return make_char(value) if len(value) == 1 else String(value)
+    return make_number(value)
+
+# the Value method each binary operator token calls
+BINARY_METHODS = {
+    TT_PLUS:"added_to",
+    TT_MINUS:"subbed_by",
+    TT_MUL:"multed_by",
+    TT_DIV:"dived_by",
+    TT_POW:"powed_by",
+    TT_EE:"get_comparison_eq",
+    TT_NE:"get_comparison_ne",
+    TT_LT:"get_comparison_lt",
+    TT_GT:"get_comparison_gt",
+    TT_LTE:"get_comparison_lte",
+    TT_GTE:"get_comparison_gte",
+    TT_AND:"anded_by",
+    TT_OR:"ored_by",
+    TT_KW_AND:"anded_by",
+    TT_KW_OR:"ored_by",
+}
+
+QUICK_OPS = {
+    ("added_to",Number,Number):numbers_added,
+    ("subbed_by",Number,Number):numbers_subbed,
+    ("multed_by",Number,Number):numbers_multed,
+    ("dived_by",Number,Number):numbers_dived,
+    ("get_comparison_eq",Number,Number):numbers_eq,
+    ("get_comparison_ne",Number,Number):numbers_ne,
+    ("get_comparison_lt",Number,Number):numbers_lt,
+    ("get_comparison_gt",Number,Number):numbers_gt,
+    ("get_comparison_lte",Number,Number):numbers_lte,
+    ("get_comparison_gte",Number,Number):numbers_gte,
+    ("added_to",String,String):strings_added,
+    ("get_comparison_eq",String,String):strings_eq,
+    ("get_comparison_ne",String,String):strings_ne,
+}
+
 class Object(Value):
+    __slots__ = ("vars",)
     typename = "object"
     def __init__(self,vars):
-        super().__init__()
         self.vars:dict = vars
         
-    def check(self,context):
+    def check(self,pos_start,pos_end,context):
         for val in self.vars.values():
             if isinstance(val,Function):
                 count = 0
@@ -263,29 +347,35 @@ class Object(Value):
                     if arg == "this":
                         count += 1
                 if count > 1:
-                    return RTResult().failure(RTError(
-                        self.pos_start,self.pos_end,
+                    return RTError(
+                        pos_start,pos_end,
                         "'this' is a reserved parameter name",context
-                    ))
-        return RTResult().success(self)
+                    )
+        return None
         
     def finish(self):
         for name,val in self.vars.items():
             if isinstance(val,Function):
+                # the function may be shared with a variable, the method gets its own name
+                val = self.vars[name] = val.copy()
                 val.arg_names.insert(0,"this")
                 val.name = f"<<object>.{name}>"
         return self
         
+    def own_vars(self):
+        # builtin objects are shared read-only, the first write gives this object its own vars
+        if not isinstance(self.vars,dict):
+            self.vars = dict(self.vars)
+        return self.vars
+
     def added_to(self, other):
         new_obj = self.copy()
-        new_obj.vars.update(other.vars)
+        new_obj.own_vars().update(other.vars)
         return new_obj,None
     
     def copy(self):
-        copy = Object(self.vars)
-        copy.set_pos(self.pos_start,self.pos_end)
-        copy.set_context(self.context)
-        return copy
+        # a separate object over the same vars, so own_vars can give it a private dict
+        return Object(self.vars)
     
     def __str__(self) -> str:
         return ', '.join([str(n)+" = "+str(v) for n,v in self.vars.items()])
@@ -294,9 +384,9 @@ class Object(Value):
         return "{"+', '.join([str(n)+" = "+str(v) for n,v in self.vars.items()])+"}"
 
 class List(Value):
+    __slots__ = ("elements",)
     typename = "list"
     def __init__(self,elements):
-        super().__init__()
         self.elements = elements
         
     def added_to(self, other):
@@ -319,10 +409,7 @@ class List(Value):
                 new_list.elements.pop(other.value)
                 return new_list,None
             except:
-                return None,RTError(
-                    other.pos_start,other.pos_end,
-                    "Element at index could not be removed because index is out of bounds",self.context
-                )
+                return None,OperationError("Element at index could not be removed because index is out of bounds",True)
         else:
             return None, self.illegal_operation(other)
         
@@ -331,18 +418,9 @@ class List(Value):
             try:
                 return self.elements[other.value],None
             except:
-                return None,RTError(
-                    other.pos_start,other.pos_end,
-                    "Element at index could not be retrieved because index is out of bounds",self.context
-                )
+                return None,OperationError("Element at index could not be retrieved because index is out of bounds",True)
         else:
             return None, self.illegal_operation(other)
-        
-    def copy(self):
-        copy = List(self.elements)
-        copy.set_pos(self.pos_start,self.pos_end)
-        copy.set_context(self.context)
-        return copy
     
     def __str__(self) -> str:
         return ', '.join([str(x) for x in self.elements])
@@ -350,68 +428,191 @@ class List(Value):
     def __repr__(self) -> str:
         return f"[{', '.join([str(x) for x in self.elements])}]"
 
+# deepest chain of calls that are not tail calls, past it a call fails with a runtime error
+RECURSION_LIMIT = 1000
+# python frames one call may take at most, solace.set_recursion_limit() raises the python limit to fit
+FRAMES_PER_CALL = 50
+
+class FramePool:
+    # finished frames with the same number of slots, handed out again to the next call that needs as many
+    def __init__(self,size):
+        self.blank = [None]*size
+        self.frames = []
+
+class ThreadState(threading.local):
+    # a frame is in use until the call that took it returns, so each thread hands out its own
+    # and counts its own calls
+    def __init__(self):
+        self.frame_pools = {}
+        self.call_depth = 0
+
+thread_state = ThreadState()
+
 class BaseFunction(Value):
+    # a function value doubles as its call site, argument errors and builtins report from it
+    __slots__ = ("name","pos_start","pos_end","context")
     typename = "function"
     def __init__(self,name):
-        super().__init__()
         self.name = name or "<anonymus>"
+        self.pos_start = None
+        self.pos_end = None
+        self.context = None
+
+    def set_pos(self, ps=None, pe=None):
+        self.pos_start = ps
+        self.pos_end = pe
+        return self
+        
+    def set_context(self,context=None):
+        self.context = context
+        return self
         
     def generate_new_context(self):
-        new_context = Context(self.name,self.context,self.pos_start)
-        new_context.symbol_table = SymbolTable(new_context.parent.symbol_table)
+        return self.new_context(self.context,self.pos_start)
+    
+    def new_context(self,context,pos_start):
+        new_context = Context(self.name,context,pos_start)
+        new_context.symbol_table = SymbolTable(context.symbol_table)
         return new_context
     
-    def check_args(self,arg_names,args):
-        res = RTResult()
-        errmsg = "allgood"
+    def execute(self,args):
+        return capture(self.call,args)
+    
+    def call_at(self,args,context,pos_start,pos_end):
+        # builtins report errors at their own position, so they still get a copy placed at the call site
+        return self.copy().set_context(context).set_pos(pos_start,pos_end).call(args)
+    
+    def args_error(self,arg_names,args):
         if len(args) > len(arg_names):
-            errmsg = f"{len(args)-len(arg_names)} too many args passed into {self.name}"
+            return f"{len(args)-len(arg_names)} too many args passed into {self.name}"
         elif len(args) < len(arg_names):
-            errmsg = f"{len(arg_names)-len(args)} too few args passed into {self.name}"
-        if errmsg != "allgood":
-            return res.failure(RTError(
+            return f"{len(arg_names)-len(args)} too few args passed into {self.name}"
+        return None
+    
+    def check_args(self,arg_names,args):
+        errmsg = self.args_error(arg_names,args)
+        if errmsg:
+            raise RuntimeFailure(RTError(
                 self.pos_start,self.pos_end,errmsg,self.context
             ))
-        return res.success(None)
     
     def populate_args(self,arg_names,args,exec_ctx):
         for i in range(len(args)):
-            arg_name = arg_names[i]
-            arg_value = args[i]
-            arg_value.set_context(exec_ctx)
-            exec_ctx.symbol_table.set(arg_name,arg_value)
+            exec_ctx.symbol_table.set(arg_names[i],args[i])
             
     def check_and_populate_args(self,arg_names,args,exec_ctx):
-        res = RTResult()
-        res.register(self.check_args(arg_names,args))
-        if res.should_return(): return res
+        self.check_args(arg_names,args)
         self.populate_args(arg_names,args,exec_ctx)
-        return res.success(None)
 
 class Function(BaseFunction):
-    def __init__(self,name, body_node,arg_names,should_auto_return):
+    __slots__ = ("body_node","arg_names","should_auto_return","layout")
+    def __init__(self,name, body_node,arg_names,should_auto_return,layout=None):
         super().__init__(name)
         
         self.body_node = body_node
         self.arg_names = arg_names
         self.should_auto_return = should_auto_return
+        self.layout = layout
         
-    def execute(self,args):
-        res = RTResult()
-        interpreter_ = interpreter()
-        exec_ctx = self.generate_new_context()
+    def new_context(self,context,pos_start):
+        if self.layout == None: return super().new_context(context,pos_start)
+        new_context = Context(self.name,context,pos_start)
+        new_context.symbol_table = SlotSymbolTable(self.layout,context.symbol_table)
+        return new_context
+        
+    def call(self,args):
+        return self.call_at(args,self.context,self.pos_start,self.pos_end)
+    
+    def call_at(self,args,context,pos_start,pos_end):
+        # the caller's context and the call site come in from the interpreter, the value itself stays shared
+        state = thread_state
+        if state.call_depth >= RECURSION_LIMIT:
+            raise RuntimeFailure(RTError(pos_start,pos_end,"Maximum recursion depth exceeded",context))
+        state.call_depth += 1
+        func = self
+        exec_ctx = self.enter(args,context,pos_start,pos_end)
+        frames = [exec_ctx]
         
-        res.register(self.check_and_populate_args(self.arg_names,args,exec_ctx))
-        if res.should_return(): return res
+        # errors and loop jumps leaving the call skip the release, the traceback may still need the frames
+        try:
+            while True:
+                try:
+                    value = interpreter.visit(func.body_node,exec_ctx)
+                    if not func.should_auto_return: value = None
+                except FunctionReturn as ret:
+                    value = ret.value
+                if type(value) != TailCall: break
+                
+                # a call in tail position runs here instead of nesting, its caller is still the frame
+                # that made it so dynamic scoping sees the same names
+                callee = value.func
+                if not isinstance(callee,Function) or callee.layout == None:
+                    value = callee.call_at(value.args,exec_ctx,value.pos_start,value.pos_end)
+                    break
+                symbol_table = exec_ctx.symbol_table
+                if callee.layout is func.layout and not exec_ctx.escaped:
+                    # a frame of the same function, the new one would only shadow it so it is taken over
+                    callee.check_arg_count(value.args,exec_ctx,value.pos_start,value.pos_end)
+                    exec_ctx.display_name = callee.name
+                    callee.bind_args(symbol_table,value.args)
+                else:
+                    exec_ctx = callee.enter(value.args,exec_ctx,value.pos_start,value.pos_end)
+                    frames.append(exec_ctx)
+                func = callee
+        except RecursionError:
+            raise RuntimeFailure(RTError(pos_start,pos_end,"Maximum recursion depth exceeded",context))
+        finally:
+            state.call_depth -= 1
         
-        value = res.register(interpreter_.visit(self.body_node,exec_ctx))
-        if res.should_return() and res.func_return_value == None: return res
+        frame_pools = thread_state.frame_pools
+        for frame in frames:
+            if frame.escaped or type(frame.symbol_table) != SlotSymbolTable: continue
+            symbol_table = frame.symbol_table
+            pool = frame_pools.get(len(symbol_table.slots))
+            if pool == None:
+                pool = frame_pools[len(symbol_table.slots)] = FramePool(len(symbol_table.slots))
+            symbol_table.slots[:] = pool.blank
+            symbol_table.symbols = None
+            pool.frames.append(frame)
+        return value or Number.null
+    
+    def check_arg_count(self,args,context,pos_start,pos_end):
+        if len(args) != len(self.arg_names):
+            raise RuntimeFailure(RTError(pos_start,pos_end,self.args_error(self.arg_names,args),context))
+    
+    def enter(self,args,context,pos_start,pos_end):
+        self.check_arg_count(args,context,pos_start,pos_end)
+        layout = self.layout
+        if layout == None:
+            exec_ctx = self.new_context(context,pos_start)
+            self.populate_args(self.arg_names,args,exec_ctx)
+            return exec_ctx
         
-        ret_value = (value if self.should_auto_return else None) or res.func_return_value or Number.null
-        return res.success(ret_value)
+        pool = thread_state.frame_pools.get(len(layout))
+        if pool != None and pool.frames:
+            exec_ctx = pool.frames.pop()
+            exec_ctx.display_name = self.name
+            exec_ctx.parent = context
+            exec_ctx.global_table = context.global_table
+            symbol_table = exec_ctx.symbol_table
+            symbol_table.layout = layout
+            symbol_table.parent = context.symbol_table
+        else:
+            exec_ctx = self.new_context(context,pos_start)
+            symbol_table = exec_ctx.symbol_table
+        self.bind_args(symbol_table,args)
+        return exec_ctx
+    
+    def bind_args(self,symbol_table,args):
+        layout = self.layout
+        slots = symbol_table.slots
+        for name,arg in zip(self.arg_names,args):
+            slot = layout.get(name)
+            if slot != None: slots[slot] = arg
+            else: symbol_table.set(name,arg)
     
     def copy(self):
-        copy = Function(self.name,self.body_node,self.arg_names,self.should_auto_return)
+        copy = Function(self.name,self.body_node,self.arg_names,self.should_auto_return,self.layout)
         copy.set_context(self.context)
         copy.set_pos(self.pos_start,self.pos_end)
         return copy
@@ -420,24 +621,20 @@ class Function(BaseFunction):
         return f"<function {self.name}>"
     
 class BuiltInFunction(BaseFunction):
+    __slots__ = ()
     def __init__(self,name,object_name=""):
         super().__init__(name)
         if object_name:
             self.name = f"{object_name}_{self.name}"
         
-    def execute(self,args):
-        res = RTResult()
+    def call(self,args):
         exec_ctx = self.generate_new_context()
         
         method_name = f"execute_{self.name}"
         method = getattr(self,method_name,self.no_execute_method)
-        res.register(self.check_and_populate_args(REAL_BUILTIN_ARGS[self.name],args,exec_ctx))
-        if res.should_return(): return res
-        
-        return_value = res.register(method(exec_ctx))
-        if res.should_return(): return res
+        self.check_and_populate_args(REAL_BUILTIN_ARGS[self.name],args,exec_ctx)
         
-        return res.success(return_value)
+        return method(exec_ctx)
     
     def copy(self):
         copy = BuiltInFunction(self.name)
@@ -456,46 +653,41 @@ class BuiltInFunction(BaseFunction):
             if type(val) != types[i]:
                 typestr = ', '.join(['\''+t.typename+'\'' for t in types])
                 details = f"Arguments must be respectively of type: {typestr}"
-                return RTResult().failure(RTError(
+                raise RuntimeFailure(RTError(
                     self.pos_start,self.pos_end,details,ctx
                 ))
-        return None
     
     def check_type(self,value,type_,ctx):
         if type(value) != type_:
             details = f"Argument must be of type: '{type_.typename}'"
-            return RTResult().failure(RTError(
+            raise RuntimeFailure(RTError(
                 self.pos_start,self.pos_end,details,ctx
             ))
-        return None
     
     def get_values(self,ctx):
         return [ctx.symbol_table.get(arg) for arg in BUILTIN_ARGS[self.name]] if len(BUILTIN_ARGS[self.name]) > 1 else ctx.symbol_table.get(BUILTIN_ARGS[self.name][0])
     
-    def return_null(self):
-        return RTResult().success(Number.null)
-    
     # BUILTINS
     
     def execute_log(self,ctx):
         value = self.get_values(ctx)
         print(str(value))
-        return self.return_null()
+        return Number.null
     
     def execute_exit(self,ctx):
         value = str(self.get_values(ctx))
-        return RTResult().failure(ExitError(value))
+        raise RuntimeFailure(ExitError(value))
     
     def execute_quit(self,ctx):
         return self.execute_exit(ctx)
     
     def execute_input(self,ctx):
         text = input(str(self.get_values(ctx)))
-        return RTResult().success(String(text))
+        return String(text)
     
     def execute_clear(self,ctx):
         os.system("cls" if os.name == "nt" else "clear")
-        return self.return_null()
+        return Number.null
     
     def execute_cls(self,ctx):
         return self.execute_clear(ctx)
@@ -513,380 +705,336 @@ class BuiltInFunction(BaseFunction):
         is_number = isinstance(value,typ)
         if specialtype:
             is_number = isinstance(value.value,specialtype)
-        return RTResult().success(Number.true if is_number else Number.false)
+        return Number.true if is_number else Number.false
     
     def execute_list(self,ctx):
-        return RTResult().success(List(list()))
+        return List(list())
     
     def execute_string(self,ctx):
-        return RTResult().success(String(""))
+        return String("")
     
     def execute_range(self,ctx):
         start,end,step = self.get_values(ctx)
-        err = self.check_types((start,end,step),(Number,Number,Number),ctx)
-        if err != None:
-            return err
-        return RTResult().success(List([Number(i) for i in range(start.value,end.value,step.value)]))
+        self.check_types((start,end,step),(Number,Number,Number),ctx)
+        return List([make_number(i) for i in range(start.value,end.value,step.value)])
     
     def execute_error(self,ctx):
         name,desc = self.get_values(ctx)
-        return RTResult().failure(CustomError(f"{str(name)}: {str(desc)}"))
+        raise RuntimeFailure(CustomError(f"{str(name)}: {str(desc)}"))
     
     def execute_len(self,ctx):
         value = self.get_values(ctx)
-        res = RTResult()
-        
         if isinstance(value,List):
-            return res.success(Number(len(value.elements)))
+            return make_number(len(value.elements))
         elif isinstance(value,String):
-            return res.success(Number(len(value.value)))
+            return make_number(len(value.value))
         elif isinstance(value,(Number)):
-            return res.success(Number(value.value))
+            return Number(value.value)
         else:
-            return res.success(Number.null)
+            return Number.null
     
     def execute_run(self,ctx):
         fn = self.get_values(ctx)
-        err = self.check_type(fn,String,ctx)
-        if err: return err
+        self.check_type(fn,String,ctx)
         fn = fn.value
         try:
-            with open(fn,"r") as f:
-                script = f.read()
-        except:
-            return RTResult().failure(RTError(
+            node,err = main_parse_file(fn)
+        except (OSError,UnicodeDecodeError):
+            raise RuntimeFailure(RTError(
                 self.pos_start,self.pos_end,
                 f"Failed to load script '{fn}'",ctx
             ))
         if not ".sol" in fn:
             print("WARNING: scripts written in Solace should be inside '.sol' files")
-        _,err = main_run(fn,script,True)
+        if not err:
+            # the script gets a fresh scope over the builtins rather than the caller's variables
+            table = ctx.symbol_table
+            while table.parent: table = table.parent
+            _,err = main_interpret(node,symbol_table=SymbolTable(table))
         if err:
-            return RTResult().failure(RTError(
+            raise RuntimeFailure(RTError(
                 self.pos_start,self.pos_end,
                 f"Failed to finish executing script '{fn}'\n"+err.as_string(),ctx
             ))
-        return RTResult().success(Number.null)
+        return Number.null
     
     def execute_String_replace(self,ctx):
         string,old,new,count = self.get_values(ctx)
-        err = self.check_types((string,old,new,count),(String,String,String,Number),ctx)
-        if err: return err
-        return RTResult().success(String(string.value.replace(old.value,new.value,int(count.value))))
+        self.check_types((string,old,new,count),(String,String,String,Number),ctx)
+        return String(string.value.replace(old.value,new.value,int(count.value)))
     
     def execute_String_toint(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
+        self.check_type(string,String,ctx)
         try:
-            return RTResult().success(Number(int(string.value)))
+            return Number(int(string.value))
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Could not convert '{string}' to 'int'",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Could not convert '{string}' to 'int'",ctx))
         
     def execute_String_tostring(self,ctx):
         value = self.get_values(ctx)
-        return RTResult().success(String(str(value)))
+        return String(str(value))
         
     def execute_String_tofloat(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
+        self.check_type(string,String,ctx)
         try:
-            return RTResult().success(Number(float(string.value)))
+            return Number(float(string.value))
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Could not convert '{string}' to 'float'",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Could not convert '{string}' to 'float'",ctx))
         
     def execute_String_tolist(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
-        return RTResult().success(List([String(val) for val in string.value]))
+        self.check_type(string,String,ctx)
+        return List([make_char(val) for val in string.value])
     
     def execute_String_empty(self,ctx):
-        return RTResult().success(String(""))
+        return String("")
     
     def execut_String_split(self,ctx):
         string,sep,count = self.get_values(ctx)
-        err = self.check_types((string,sep,count),(String,String,Number),ctx)
-        if err: return err
-        return RTResult().success(List([String(val) for val in string.value.split(sep.value,count.value)]))
+        self.check_types((string,sep,count),(String,String,Number),ctx)
+        return List([String(val) for val in string.value.split(sep.value,count.value)])
     
     def execute_String_lower(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
-        return RTResult().success(String(string.value.lower()))
+        self.check_type(string,String,ctx)
+        return String(string.value.lower())
     
     def execute_String_upper(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
-        return RTResult().success(String(string.value.upper()))
+        self.check_type(string,String,ctx)
+        return String(string.value.upper())
     
     def execute_String_title(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
-        return RTResult().success(String(string.value.title()))
+        self.check_type(string,String,ctx)
+        return String(string.value.title())
     
     def execute_String_capitalize(self,ctx):
         string = self.get_values(ctx)
-        err = self.check_type(string,String,ctx)
-        if err: return err
-        return RTResult().success(String(string.value.capitalize()))
+        self.check_type(string,String,ctx)
+        return String(string.value.capitalize())
     
     def execute_String_count(self,ctx):
         string,substring = self.get_values(ctx)
-        err = self.check_types((string,substring),(String,String),ctx)
-        if err: return err
-        return RTResult().success(Number(string.value.count(substring.value)))
+        self.check_types((string,substring),(String,String),ctx)
+        return make_number(string.value.count(substring.value))
     
     def execute_String_startswith(self,ctx):
         string,substring = self.get_values(ctx)
-        err = self.check_types((string,substring),(String,String),ctx)
-        if err: return err
-        return RTResult().success(Number.true if string.value.startswith(substring.value) else Number.false)
+        self.check_types((string,substring),(String,String),ctx)
+        return Number.true if string.value.startswith(substring.value) else Number.false
     
     def execute_String_endswith(self,ctx):
         string,substring = self.get_values(ctx)
-        err = self.check_types((string,substring),(String,String),ctx)
-        if err: return err
-        return RTResult().success(Number.true if string.value.endswith(substring.value) else Number.false)
+        self.check_types((string,substring),(String,String),ctx)
+        return Number.true if string.value.endswith(substring.value) else Number.false
     
     def execute_String_find(self,ctx):
         string,substring = self.get_values(ctx)
-        err = self.check_types((string,substring),(String,String),ctx)
-        if err: return err
-        return RTResult().success(Number(string.value.find(substring.value)))
+        self.check_types((string,substring),(String,String),ctx)
+        return make_number(string.value.find(substring.value))
     
     def execute_String_rfind(self,ctx):
         string,substring = self.get_values(ctx)
-        err = self.check_types((string,substring),(String,String),ctx)
-        if err: return err
-        return RTResult().success(Number(string.value.rfind(substring.value)))
+        self.check_types((string,substring),(String,String),ctx)
+        return make_number(string.value.rfind(substring.value))
     
     def execute_Float_toint(self,ctx):
         float_ = self.get_values(ctx)
-        err = self.check_type(float_,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(int(float_.value)))
+        self.check_type(float_,Number,ctx)
+        return Number(int(float_.value))
     
     def execute_Time_now(self,ctx):
-        return RTResult().success(Number(time.time()))
+        return Number(time.time())
     
     def execute_Time_delta(self,ctx):
         last = self.get_values(ctx)
-        err = self.check_type(last,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(time.time()-last.value))
+        self.check_type(last,Number,ctx)
+        return Number(time.time()-last.value)
     
     def execute_File_read(self,ctx):
         name = self.get_values(ctx)
-        err = self.check_type(name,String,ctx)
-        if err: return err
+        self.check_type(name,String,ctx)
         try:
             with open(name.value,"r") as file:
-                return RTResult().success(String(file.read()))
+                return String(file.read())
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot read from file '{name}'. Check if the file exists",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot read from file '{name}'. Check if the file exists",ctx))
         
     def execute_File_write(self,ctx):
         name,content = self.get_values(ctx)
-        err = self.check_types((name,content),(String,String),ctx)
-        if err: return err
+        self.check_types((name,content),(String,String),ctx)
         try:
             with open(name.value,"w") as file:
                 file.write(content.value)
-                return self.return_null()
+                return Number.null
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot write to file '{name}'. Check if the file exists",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot write to file '{name}'. Check if the file exists",ctx))
         
     def execute_File_remove(self,ctx):
         name = self.get_values(ctx)
-        err = self.check_type(name,String,ctx)
-        if err: return err
+        self.check_type(name,String,ctx)
         try:
             os.remove(name.value)
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot remove file '{name}'. Check if the file exists",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot remove file '{name}'. Check if the file exists",ctx))
+        return Number.null
         
     def execute_File_exists(self,ctx):
         name = self.get_values(ctx)
-        err = self.check_type(name,String,ctx)
-        if err: return err
-        return RTResult().success(Number.true if os.path.exists(name.value) else Number.false)
+        self.check_type(name,String,ctx)
+        return Number.true if os.path.exists(name.value) else Number.false
     
     def execute_File_listdir(self,ctx):
         name = self.get_values(ctx)
-        err = self.check_type(name,String,ctx)
-        if err: return err
+        self.check_type(name,String,ctx)
         try:
-            return RTResult().success(List([String(val) for val in os.listdir(name.value)]))
+            return List([String(val) for val in os.listdir(name.value)])
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot list the directory '{name}'. Check if it exists",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot list the directory '{name}'. Check if it exists",ctx))
         
     def execute_List_add(self,ctx):
         list_,value = self.get_values(ctx)
-        err = self.check_type(list_,List,ctx)
-        if err: return err
+        self.check_type(list_,List,ctx)
         list_.elements.append(value)
-        return RTResult().success(list_)
+        return list_
     
     def execute_List_extend(self,ctx):
         lista,listb = self.get_values(ctx)
-        err = self.check_types((lista,listb),(List,List),ctx)
-        if err: return err
+        self.check_types((lista,listb),(List,List),ctx)
         lista.elements.extend(listb.elements)
-        return RTResult().success(lista)
+        return lista
     
     def execute_List_insert(self,ctx):
         list_,index,value = self.get_values(ctx)
-        err = self.check_types((list_,index),(List,Number),ctx)
-        if err: return err
+        self.check_types((list_,index),(List,Number),ctx)
         list_.elements.insert(index.value,value)
-        return RTResult().success(list_)
+        return list_
     
     def execute_List_get(self,ctx):
         list_,index = self.get_values(ctx)
-        err = self.check_types((list_,index),(List,Number),ctx)
-        if err: return err
+        self.check_types((list_,index),(List,Number),ctx)
         try:
-            return RTResult().success(list_.elements[index.value])
+            return list_.elements[index.value]
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot get value at index '{index}' because it's out of bounds",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot get value at index '{index}' because it's out of bounds",ctx))
         
     def execute_List_set(self,ctx):
         list_,index,value = self.get_values(ctx)
-        err = self.check_types((list_,index),(List,Number),ctx)
-        if err: return err
+        self.check_types((list_,index),(List,Number),ctx)
         try:
             list_.elements[index.value]= value
-            return RTResult().success(list_)
+            return list_
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot set value at index '{index}' because it's out of bounds",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot set value at index '{index}' because it's out of bounds",ctx))
         
     def execute_List_pop(self,ctx):
         list_,index = self.get_values(ctx)
-        err = self.check_types((list_,index),(List,Number),ctx)
-        if err: return err
+        self.check_types((list_,index),(List,Number),ctx)
         try:
             list_.elements.pop(index.value)
-            return RTResult().success(list_)
+            return list_
         except:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,f"Cannot pop value at index '{index}' because it's out of bounds",ctx))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,f"Cannot pop value at index '{index}' because it's out of bounds",ctx))
         
     def execute_help(self,ctx):
-        return RTResult().success(String(str(BUILTIN_ARGS).replace("{","").replace("{","").replace("'","")))
+        return String(str(BUILTIN_ARGS).replace("{","").replace("{","").replace("'",""))
     
     def execute_Math_round(self,ctx):
         number,decimals = self.get_values(ctx)
-        err = self.check_types((number,decimals),(Number,Number),ctx)
-        if err: return err
-        return RTResult().success(Number(round(number.value,decimals.value)))
+        self.check_types((number,decimals),(Number,Number),ctx)
+        return Number(round(number.value,decimals.value))
     
     def execute_Math_floor(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.floor(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.floor(number.value))
     
     def execute_Math_cos(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.cos(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.cos(number.value))
     
     def execute_Math_sin(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.sin(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.sin(number.value))
     
     def execute_Math_tan(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.tan(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.tan(number.value))
     
     def execute_Math_acos(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.acos(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.acos(number.value))
     
     def execute_Math_asin(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.asin(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.asin(number.value))
     
     def execute_Math_atan(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.atan(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.atan(number.value))
     
     def execute_Math_pow(self,ctx):
         number,exponent = self.get_values(ctx)
-        err = self.check_types((number,exponent),(Number,Number),ctx)
-        if err: return err
-        return RTResult().success(Number(math.pow(number.value,exponent.value)))
+        self.check_types((number,exponent),(Number,Number),ctx)
+        return Number(math.pow(number.value,exponent.value))
     
     def execute_Math_factorial(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.factorial(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.factorial(number.value))
     
     def execute_Math_degrees(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.degrees(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.degrees(number.value))
     
     def execute_Math_radians(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.radians(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.radians(number.value))
     
     def execute_Math_log(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
-        return RTResult().success(Number(math.log(number.value)))
+        self.check_type(number,Number,ctx)
+        return Number(math.log(number.value))
     
     def execute_Math_sqrt(self,ctx):
         number = self.get_values(ctx)
-        err = self.check_type(number,Number,ctx)
-        if err: return err
+        self.check_type(number,Number,ctx)
         if number.value < 0:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,"Cannot take the square root of a negative number",ctx))
-        return RTResult().success(Number(math.sqrt(number.value)))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,"Cannot take the square root of a negative number",ctx))
+        return Number(math.sqrt(number.value))
     
     def execute_Random_randint(self,ctx):
         rangea,rangeb = self.get_values(ctx)
-        err = self.check_types((rangea,rangeb),(Number,Number),ctx)
-        if err: return err
-        return RTResult().success(Number(random.randint(int(rangea.value),int(rangeb.value))))
+        self.check_types((rangea,rangeb),(Number,Number),ctx)
+        return Number(random.randint(int(rangea.value),int(rangeb.value)))
     
     def execute_Random_randfloat(self,ctx):
         rangea,rangeb = self.get_values(ctx)
-        err = self.check_types((rangea,rangeb),(Number,Number),ctx)
-        if err: return err
-        return RTResult().success(Number(random.uniform(rangea.value,rangeb.value)))
+        self.check_types((rangea,rangeb),(Number,Number),ctx)
+        return Number(random.uniform(rangea.value,rangeb.value))
     
     def execute_Random_choice(self,ctx):
         list_ = self.get_values(ctx)
-        err = self.check_type(list_,List,ctx)
+        self.check_type(list_,List,ctx)
         if len(list_.elements) <= 0:
-            return RTResult().failure(RTError(self.pos_start,self.pos_end,"Cannot choose from an empty list",ctx))
-        if err: return err
-        return RTResult().success(Number(random.choice(list_.elements)))
+            raise RuntimeFailure(RTError(self.pos_start,self.pos_end,"Cannot choose from an empty list",ctx))
+        return Number(random.choice(list_.elements))
     
 class BuiltInObject(Object):
+    __slots__ = ()
     def __init__(self,name):
         vars_ = {}
         for func in BUILTIN_OBJS[name]:
             vars_[func] = BuiltInFunction(func,name)
-        super().__init__(vars_)
\ No newline at end of file
+        super().__init__(MappingProxyType(vars_))
\ No newline at end of file
@@ -0,0 +1,307 @@
+from values import *
+from compiler import *
+from runtime import *
+from symboltable import local_names
+import values
+
+class CompiledFunction(Function):
+    __slots__ = ("code",)
+    def __init__(self,name,code,arg_names,should_auto_return):
+        super().__init__(name,None,arg_names,should_auto_return)
+        self.code = code
+
+    def call(self,args):
+        return self.call_at(args,self.context,self.pos_start,self.pos_end)
+
+    def call_at(self,args,context,pos_start,pos_end):
+        state = values.thread_state
+        if state.call_depth >= values.RECURSION_LIMIT:
+            raise RuntimeFailure(RTError(pos_start,pos_end,"Maximum recursion depth exceeded",context))
+        func = self
+        state.call_depth += 1
+        try:
+            while True:
+                func.check_arg_count(args,context,pos_start,pos_end)
+                exec_ctx = func.new_context(context,pos_start)
+                func.populate_args(func.arg_names,args,exec_ctx)
+                
+                res = VM().run(func.code,exec_ctx)
+                if res.should_return() and res.func_return_value == None: res.unwrap()
+                
+                value = (res.value if func.should_auto_return else None) or res.func_return_value
+                if type(value) != TailCall: return value or Number.null
+                # a call in tail position, run here instead of nesting another vm
+                func,args,context,pos_start,pos_end = value.func,value.args,exec_ctx,value.pos_start,value.pos_end
+                if not isinstance(func,CompiledFunction): return func.call_at(args,context,pos_start,pos_end)
+        finally:
+            state.call_depth -= 1
+
+    def copy(self):
+        copy = CompiledFunction(self.name,self.code,self.arg_names,self.should_auto_return)
+        copy.set_context(self.context)
+        copy.set_pos(self.pos_start,self.pos_end)
+        return copy
+
+class VM:
+    def __init__(self):
+        pass
+
+    def unwind(self,stack,blocks,should_break):
+        break_addr,continue_addr,stack_height = blocks[-1]
+        del stack[stack_height:]
+        return break_addr if should_break else continue_addr
+
+    def run(self,code,context):
+        res = RTResult()
+        instructions = code.instructions
+        positions = code.positions
+        caches = code.caches
+        symbol_table = context.symbol_table
+        stack = []
+        push = stack.append
+        pop = stack.pop
+        blocks = []
+        pc = 0
+
+        while True:
+            op,arg = instructions[pc]
+            pc += 1
+
+            if op == OP_LOAD_NAME:
+                cache = caches.get(pc)
+                if cache != None and cache[0] == SymbolTable.version and cache[1] is context.global_table:
+                    value = cache[2]
+                else:
+                    value = symbol_table.get(arg)
+                    if value != None and not arg in local_names:
+                        caches[pc] = (SymbolTable.version,context.global_table,value)
+                pos_start,pos_end = positions[pc-1]
+                if not value:
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"'{arg}' is not defined",context
+                    ))
+                push(value)
+
+            elif op == OP_LOAD_CONST:
+                push(arg)
+
+            elif op == OP_BINARY_OP:
+                right = pop()
+                left = pop()
+                method,right_start,adaptive = arg
+                result,error = getattr(left,method)(right)
+                if error:
+                    pos_start,pos_end = positions[pc-1]
+                    return res.failure(error.locate(pos_start,right_start,pos_end,context))
+                if adaptive:
+                    quick = quickened(method,left,right)
+                    if quick != None: instructions[pc-1] = (OP_BINARY_QUICK,(quick,method,right_start))
+                push(result)
+
+            elif op == OP_BINARY_QUICK:
+                right = pop()
+                left = pop()
+                quick,method,right_start = arg
+                result = quick(left,right)
+                if result == None:
+                    # the operand types changed, the instruction goes back to the generic path for good
+                    instructions[pc-1] = (OP_BINARY_OP,(method,right_start,False))
+                    result,error = getattr(left,method)(right)
+                    if error:
+                        pos_start,pos_end = positions[pc-1]
+                        return res.failure(error.locate(pos_start,right_start,pos_end,context))
+                push(result)
+
+            elif op == OP_SHORT_CIRCUIT:
+                method,end = arg
+                result = short_circuit(method,stack[-1])
+                if result != None:
+                    stack[-1] = result
+                    pc = end
+
+            elif op == OP_POP:
+                pop()
+
+            elif op == OP_STORE_NAME:
+                symbol_table.set(arg,stack[-1])
+
+            elif op == OP_JUMP:
+                pc = arg
+
+            elif op == OP_POP_JUMP_IF_FALSE:
+                if not pop().is_true():
+                    pc = arg
+
+            elif op == OP_FOR_ITER:
+                state = stack[-1]
+                i = state[0]
+                if (i < state[1].value) if state[3] else (i > state[1].value):
+                    symbol_table.set(arg[0],make_number(i))
+                    state[0] = i+state[2]
+                else:
+                    pc = arg[1]
+
+            elif op == OP_LIST_APPEND:
+                value = pop()
+                stack[-1][-1].append(value)
+
+            elif op == OP_CALL or op == OP_TAIL_CALL:
+                args_start = len(stack)-arg
+                args = stack[args_start:]
+                del stack[args_start:]
+                value_to_call = pop()
+                pos_start,pos_end = positions[pc-1]
+                if op == OP_TAIL_CALL:
+                    push(TailCall(value_to_call,args,pos_start,pos_end))
+                    continue
+
+                call_res = capture(value_to_call.call_at,args,context,pos_start,pos_end)
+                if call_res.should_return():
+                    if call_res.error: return res.failure(call_res.error)
+                    if not blocks: return call_res
+                    pc = self.unwind(stack,blocks,call_res.loop_should_break)
+                    continue
+                push(call_res.value)
+
+            elif op == OP_LOAD_NULL:
+                push(Number.null)
+
+            elif op == OP_UNARY_OP:
+                number = pop()
+                unary,operand_start = arg
+                error = None
+                if unary == UNARY_MINUS:
+                    number,error = number.multed_by(make_number(-1))
+                elif unary == UNARY_NOT:
+                    number,error = number.notted()
+                if error:
+                    _,pos_end = positions[pc-1]
+                    return res.failure(error.locate(operand_start,operand_start,pos_end,context))
+                push(number)
+
+            elif op == OP_LOAD_ATTR or op == OP_LOAD_METHOD:
+                obj = pop()
+                pos_start,pos_end = positions[pc-1]
+                if not obj:
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"Object is not defined",context
+                    ))
+                if not isinstance(obj,Object):
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"Expression should be an object",context
+                    ))
+                value = obj.vars.get(arg,None)
+                if not value:
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"Object has no attribute '{arg}'",context
+                    ))
+                push(value)
+                if op == OP_LOAD_METHOD: push(obj)
+
+            elif op == OP_LOAD_ATTR_TARGET:
+                obj_name,var_name = arg
+                obj = symbol_table.get(obj_name)
+                pos_start,pos_end = positions[pc-1]
+                if not obj:
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"'{obj_name}' is not defined",context
+                    ))
+                if not isinstance(obj,Object):
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"'{obj_name}' should be an object",context
+                    ))
+                if not var_name in obj.vars.keys():
+                    return res.failure(RTError(
+                        pos_start,pos_end,
+                        f"'{obj_name}' has no attribute '{var_name}'",context
+                    ))
+                if not isinstance(obj.vars,dict):
+                    obj = symbol_table.get_private(obj_name)
+                    obj.own_vars()
+                push(obj)
+
+            elif op == OP_STORE_ATTR:
+                value = pop()
+                obj = pop()
+                obj.vars[arg] = value
+                push(value)
+
+            elif op == OP_MAKE_FUNCTION:
+                func_name,func_code,arg_names,should_auto_return = arg
+                pos_start,pos_end = positions[pc-1]
+                func_value = CompiledFunction(func_name,func_code,list(arg_names),should_auto_return).set_context(context).set_pos(pos_start,pos_end)
+                if func_name:
+                    symbol_table.set(func_name,func_value)
+                push(func_value)
+
+            elif op == OP_BUILD_LIST:
+                elements_start = len(stack)-arg
+                elements = stack[elements_start:]
+                del stack[elements_start:]
+                push(List(elements))
+
+            elif op == OP_BUILD_OBJECT:
+                values_start = len(stack)-len(arg)
+                vars = {}
+                for name,value in zip(arg,stack[values_start:]):
+                    vars[name] = value
+                del stack[values_start:]
+                pos_start,pos_end = positions[pc-1]
+                obj = Object(vars).finish()
+                error = obj.check(pos_start,pos_end,context)
+                if error: return res.failure(error)
+
+                main_res = None
+                for name,var in obj.vars.items():
+                    if name == "main":
+                        main_res = capture(var.call_at,[obj],context,var.pos_start,var.pos_end)
+                        if main_res.should_return(): break
+                if main_res and main_res.should_return():
+                    if main_res.error: return res.failure(main_res.error)
+                    if not blocks: return main_res
+                    pc = self.unwind(stack,blocks,main_res.loop_should_break)
+                    continue
+                push(obj)
+
+            elif op == OP_SETUP_LOOP:
+                blocks.append((arg[0],arg[1],len(stack)))
+
+            elif op == OP_FOR_PREP:
+                step_value = pop()
+                end_value = pop()
+                start_value = pop()
+                push([start_value.value,end_value,step_value.value,step_value.value >= 0,[]])
+
+            elif op == OP_WHILE_PREP:
+                push([[]])
+
+            elif op == OP_LOOP_END:
+                blocks.pop()
+                state = pop()
+                if arg:
+                    push(Number.null)
+                else:
+                    push(List(state[-1]))
+
+            elif op == OP_BREAK_LOOP:
+                if not blocks: return res.success_break()
+                pc = self.unwind(stack,blocks,True)
+
+            elif op == OP_CONTINUE_LOOP:
+                if not blocks: return res.success_continue()
+                pc = self.unwind(stack,blocks,False)
+
+            elif op == OP_RETURN_VALUE:
+                return res.success_return(pop())
+
+            elif op == OP_END:
+                return res.success(pop())
+
+            else:
+                raise Exception(f"Unknown opcode {op}")